@@ -1,115 +1,304 @@
 # app.py
-import os
-import json
 import pandas as pd
+import numpy as np
 
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
-from typing import Dict, Tuple, List
-from openai import OpenAI
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
+from typing import List
 from dotenv import load_dotenv
+from starlette.concurrency import run_in_threadpool
 
-from config.settings import Settings
-from inference import Infer
-from preprocess import Preprocessor
-from train import Train
+from config.settings import get_settings
+from inference import Infer, decision_lane, decision_lanes
+from inference.microbatch import batcher
+from inference.readiness import ModelReadiness, readiness
+from inference.registry import registry, release_lock
+from inference.stream import (
+    PARSERS,
+    UploadStreamingResponse,
+    score_stream,
+    stream_format,
+)
+from llm import LLMError, LLMTimeout, LLMUnavailable, explanation_cache, llm_client
+from llm.explain import DECISIONS, explain_many, explain_record, explanation_request
+from llm.stream import stream_explanation
 from models import MLClaimDataRequest, LLMClaimDataRequest
+from models.batch import ORJSONResponse, claims_frame, openapi_body
+from telemetry import TelemetryMiddleware, metrics_payload
 
 load_dotenv()
-settings = Settings()
+settings = get_settings()
 
-ARTIFACTS_DIR = getattr(settings, "artifacts_path", "artifacts")
-MODEL_PATH = os.path.join(
-    ARTIFACTS_DIR, "model.pkl"
-)  # adjust to your trainer’s save path
 
+def _load_published(status: ModelReadiness = None) -> bool:
+    if not registry.exists():
+        return False
+    try:
+        if status is not None:
+            status.set_phase("loading")
+        registry.load()
+        return True
+    except (ValueError, OSError) as exc:
+        print(f"📌 Retraining: {exc}")
+        return False
 
-def prepare_model_on_startup() -> None:
+
+def prepare_model_on_startup(status: ModelReadiness = None) -> None:
     """
-    If model artifact doesn't exist, run the full pipeline:
-    read -> preprocess -> train (which should save artifacts to ARTIFACTS_DIR).
+    If no release has been published, or the published one doesn't load (for
+    example it was trained for another model backend), run the full pipeline:
+    read (cached Parquet copy) -> preprocess -> train (which publishes a release where the registry loads it).
+    Then load the artifacts once into the process-wide registry.
+    `status`, if given, is told which phase it's in.
+
+    Training holds `release_lock`, so of several workers starting cold one
+    trains and the others wait for it, then load what it published.
     """
-    os.makedirs(ARTIFACTS_DIR, exist_ok=True)
-    if not os.path.exists(MODEL_PATH):
-        # --- your original startup code ---
-        df = pd.read_excel(os.path.join(settings.data_path))
-        preprocess = Preprocessor(df)
-        df = preprocess.preprocess()
+    if _load_published(status):
+        return
+
+    with release_lock():
+        # Another worker may have published while this one waited
+        if _load_published(status):
+            return
+
+        if status is not None:
+            status.set_phase("training")
+        # The training stack (model selection, metrics, search) is only imported
+        # by a process that actually has to train
+        from preprocess import Preprocessor
+        from train import Train
+
+        # Parquet copy of the sheet: parsed once per source version, not per retrain
+        preprocess = Preprocessor.from_dataset()
+        X, y = preprocess.fit_transform()
 
-        trainer = Train(df)
-        trainer.run()  # make sure this saves to MODEL_PATH (or adjust path above)
-        # -----------------------------------
-    # else: artifacts already present; nothing to do
+        trainer = Train.from_arrays(
+            X,
+            y,
+            categorical_features=preprocess.pipeline.categorical_mask_,
+            pipeline=preprocess.pipeline,
+        )
+        trainer.run()
+
+    registry.load()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
-    prepare_model_on_startup()
+    # Startup: load (or train, if needed) in the background so the server can
+    # answer probes right away; model routes return 503 until it's ready
+    readiness.start(prepare_model_on_startup)
+    # One pooled OpenAI client for every /explian request
+    llm_client.start()
+    # Coalesces concurrent /predict calls into one model pass
+    batcher.start()
     yield
-    # Shutdown (nothing special)
+    await batcher.aclose()
+    await llm_client.aclose()
+    if explanation_cache is not None:
+        explanation_cache.close()
 
 
 app = FastAPI(lifespan=lifespan)
+# Per-route latency for /metrics; ?profile=true when [telemetry] profiling is on
+app.add_middleware(TelemetryMiddleware, profiling=settings.telemetry_profiling)
 
 
-def build_chatgpt_prompts(record: Dict) -> Tuple[str, str]:
-    glossary_text = "\n".join(
-        f"- **{k}**: {v}" for k, v in settings.COLUMN_GLOSSARY.items()
-    )
+def require_model() -> None:
+    if not readiness.ready:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Model not ready ({readiness.phase})",
+            headers={"Retry-After": "5"},
+        )
+
+
+@app.get("/healthz")
+def healthz() -> dict:
+    # Liveness: the process is up and serving, whatever the model is doing
+    return {"status": "ok", "model": readiness.phase}
 
-    system_prompt = (
-        "You are an impartial insurance claims reviewer. The system has already decided "
-        "to COMPLETED or DECLINED each claim. Your job is to explain that decision clearly, "
-        "concisely, and defensibly using only the provided fields. Do not re-decide the outcome, "
-        "and do not invent facts. If information is missing, say so."
+
+@app.get("/readyz")
+def readyz():
+    # Readiness: only route traffic here once the model is loaded
+    return JSONResponse(readiness.info(), status_code=200 if readiness.ready else 503)
+
+
+@app.post("/predict", dependencies=[Depends(require_model)])
+async def predict(features: MLClaimDataRequest, proba: bool = False) -> dict:
+    """
+    Scored together with whatever other /predict calls arrive within
+    `batching.max_wait_ms` (see inference/microbatch.py).
+    """
+    label, probability = await batcher.submit(features.model_dump())
+    if not proba:
+        return {"prediction": [label]}
+
+    return {
+        "prediction": [label],
+        "probability": [probability],
+        "lane": [decision_lane(label, probability)],
+    }
+
+
+def score_batch(body: bytes, proba: bool) -> ORJSONResponse:
+    claims = claims_frame(body)
+    if len(claims):
+        labels, probabilities = Infer(claims).predict_with_proba()
+    else:
+        # The calibrator rejects zero samples; an empty batch has empty results
+        labels, probabilities = np.empty(0, dtype=int), np.empty(0)
+    if not proba:
+        return ORJSONResponse({"predictions": labels})
+    return ORJSONResponse(
+        {
+            "predictions": labels,
+            "probabilities": probabilities,
+            "lanes": decision_lanes(labels, probabilities),
+        }
     )
 
-    user_prompt = f"""
-You are given:
 
-1) Column meanings:
-{glossary_text}
+@app.post(
+    "/batch-predict",
+    dependencies=[Depends(require_model)],
+    response_class=ORJSONResponse,
+    openapi_extra=openapi_body(),
+)
+async def batch_predict(request: Request, proba: bool = False):
+    """
+    Score many claims at once. The body is either a list of claim objects
+    (rows) or one object of equal-length arrays per field (columns, e.g.
+    {"rrp": [1319.0, 999.0], "country": ["NL", "DE"], ...}). Either way it is
+    validated in a single pass (models/batch.py) and the result is rendered by orjson.
+    """
+    body = await request.body()
+    # Validation, scoring and rendering are CPU-bound: keep them off the event loop
+    return await run_in_threadpool(score_batch, body, proba)
+
 
-2) The claim record (JSON). It already contains the final decision under "decision".
-Use ONLY this data to explain why the claim was accepted or rejected.
+@app.post("/batch-predict/stream", dependencies=[Depends(require_model)])
+async def batch_predict_stream(request: Request, format: str = None):
+    """
+    Bulk scoring with bounded memory: the body is a chunked NDJSON or CSV upload
+    (Content-Type text/csv or ?format=csv), scored in micro-batches of
+    `stream.chunk_size` claims. Returns NDJSON lines {"row": i, "prediction": p}
+    (or {"row": i, "error": ...}) as each micro-batch finishes.
+    """
+    fmt = stream_format(request.headers.get("content-type"), format)
+    if fmt not in PARSERS:
+        raise HTTPException(status_code=415, detail=f"Unsupported format: {fmt}")
 
-```json
-{json.dumps(record, ensure_ascii=False, indent=2)}
-"""
-    return system_prompt, user_prompt
+    records = PARSERS[fmt](request.stream())
+    body = score_stream(records, registry.get(), settings.stream_chunk_size)
+    return UploadStreamingResponse(body, media_type="application/x-ndjson")
 
 
-@app.post("/predict")
-def predict(features: MLClaimDataRequest) -> dict:
-    df = pd.DataFrame([features.model_dump()]).reindex(columns=settings.FIELD_ORDER)
-    infer = Infer(df)
-    return {"prediction": infer.predict()}
+@app.get("/metrics")
+def metrics() -> Response:
+    body, content_type = metrics_payload()
+    return Response(body, media_type=content_type)
 
 
-@app.post("/batch-predict")
-def batch_predict(features: List[MLClaimDataRequest]) -> dict:
-    rows = [f.model_dump() for f in features]
-    df = pd.DataFrame(rows).reindex(columns=settings.FIELD_ORDER)
-    infer = Infer(df)
-    preds = infer.predict()
-    return {"predictions": list(preds)}
+@app.get("/model/version")
+def model_version() -> dict:
+    return registry.info()
 
 
 @app.post("/explian")
-def llm(record: LLMClaimDataRequest):
-    system_prompt, user_prompt = build_chatgpt_prompts(record=record.model_dump())
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    resp = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
-        temperature=0.2,
-        max_tokens=500,
-    )
-    return resp.choices[0].message.content
+async def llm(
+    record: LLMClaimDataRequest,
+    request: Request,
+    response: Response,
+    stream: bool = False,
+):
+    """
+    Explain a decision. With `?stream=true` the completion is forwarded as
+    Server-Sent Events as it is generated (see llm/stream.py).
+    """
+    record = record.model_dump()
+    try:
+        if stream:
+            messages, key = explanation_request(record)
+            return await stream_explanation(request, messages, key)
+        content, cached = await explain_record(record)
+    except LLMUnavailable as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    except LLMTimeout:
+        raise HTTPException(status_code=504, detail="LLM request timed out")
+    except LLMError as exc:
+        raise HTTPException(status_code=502, detail=f"LLM request failed: {exc}")
+
+    response.headers["X-Cache"] = "HIT" if cached else "MISS"
+    return content
+
+
+async def assess_records(records: List[dict], explain: bool) -> List[dict]:
+    if not records:
+        # The calibrator rejects zero samples; an empty batch has empty results
+        return []
+    artifacts = registry.get()
+    if len(records) == 1:
+        label, probability = await run_in_threadpool(
+            Infer.predict_record_proba, records[0], artifacts
+        )
+        labels, probabilities = [label], [probability]
+    else:
+        df = pd.DataFrame(records).reindex(columns=settings.FIELD_ORDER)
+        labels, probabilities = await run_in_threadpool(
+            Infer(df, artifacts=artifacts).predict_with_proba
+        )
+
+    results = [
+        {
+            "prediction": int(l),
+            "decision": DECISIONS[int(l)],
+            "probability": float(p),
+            "lane": decision_lane(l, p),
+        }
+        for l, p in zip(labels, probabilities)
+    ]
+    if explain:
+        # Fast-laned claims are confident enough not to need an explanation
+        review = [i for i, result in enumerate(results) if result["lane"] == "review"]
+        explained = await explain_many(
+            [dict(records[i], decision=results[i]["decision"]) for i in review],
+            timeout=settings.assess_explain_timeout,
+            concurrency=settings.assess_explain_concurrency,
+        )
+        for i, explanation in zip(review, explained):
+            results[i].update(explanation)
+    return results
+
+
+@app.post("/assess", dependencies=[Depends(require_model)])
+async def assess(features: MLClaimDataRequest, explain: bool = True) -> dict:
+    """
+    Predict and explain in one call: {"prediction", "decision", "probability",
+    "lane", "explanation", "cached"}, or "error" in place of "cached" if the
+    explanation failed. Fast-laned claims (see [decision]) aren't explained.
+    """
+    results = await assess_records([features.model_dump()], explain)
+    return results[0]
+
+
+@app.post("/assess/batch", dependencies=[Depends(require_model)])
+async def assess_batch(
+    features: List[MLClaimDataRequest], explain: bool = True
+) -> dict:
+    """
+    Score the whole batch in one model pass, then explain every claim left
+    in the "review" lane concurrently. Explanations still running after `assess.explain_timeout`
+    come back with an error instead of holding up the rest.
+    """
+    results = await assess_records([f.model_dump() for f in features], explain)
+    return {
+        "results": results,
+        "explained": sum(r.get("explanation") is not None for r in results),
+    }
 
 
 if __name__ == "__main__":
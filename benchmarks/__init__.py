@@ -0,0 +1,6 @@
+"""Stand-alone performance benchmarks. Run from the project root, e.g.
+
+python -m benchmarks.sparse_onehot --rows 100000
+python -m benchmarks.suite --output bench.json
+python -m benchmarks.suite --output new.json --baseline bench.json
+"""
@@ -0,0 +1,132 @@
+"""`/batch-predict` request validation + response serialization, before and after.
+
+For `--rows` synthetic claims (`benchmarks.synthetic`), times what the
+handler spends outside the model:
+
+- before: FastAPI's path for a `List[MLClaimDataRequest]` body (`json.loads`,
+  one model per claim, `model_dump` per claim, DataFrame from the dicts),
+  then `jsonable_encoder` + `JSONResponse` for the result lists
+- rows / columns: `models.batch.claims_frame` on the same claims as a list
+  of objects / as field -> array, then `ORJSONResponse` on the NumPy results
+
+Each variant is checked to produce the same DataFrame and the same
+predictions. Times are medians of `--repeats` runs, with `?proba=true`
+responses (labels, probabilities, lanes).
+"""
+
+import argparse
+import json
+import time
+from typing import List
+
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from benchmarks.synthetic import synthetic_claims
+from config.settings import get_settings
+from inference import Infer, decision_lane, decision_lanes
+from inference.registry import registry
+from models import MLClaimDataRequest
+from models.batch import ORJSONResponse, claims_frame
+
+settings = get_settings()
+
+LEGACY = TypeAdapter(List[MLClaimDataRequest])
+
+
+def legacy_frame(body: bytes) -> pd.DataFrame:
+    features = LEGACY.validate_python(json.loads(body))
+    rows = [f.model_dump() for f in features]
+    return pd.DataFrame(rows).reindex(columns=settings.FIELD_ORDER)
+
+
+def legacy_response(labels, probabilities) -> bytes:
+    content = {
+        "predictions": labels.tolist(),
+        "probabilities": probabilities.tolist(),
+        "lanes": [decision_lane(l, p) for l, p in zip(labels, probabilities)],
+    }
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def orjson_response(labels, probabilities) -> bytes:
+    content = {
+        "predictions": labels,
+        "probabilities": probabilities,
+        "lanes": decision_lanes(labels, probabilities),
+    }
+    return ORJSONResponse(content).body
+
+
+def timed(fn, repeats: int):
+    timings, result = [], None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    claims = synthetic_claims(args.rows)
+    rows_body = json.dumps(claims).encode()
+    columns_body = json.dumps(
+        {field: [c[field] for c in claims] for field in settings.FIELD_ORDER}
+    ).encode()
+
+    artifacts = registry.load()
+    variants = {
+        "before": (lambda: legacy_frame(rows_body), legacy_response),
+        "rows": (lambda: claims_frame(rows_body), orjson_response),
+        "columns": (lambda: claims_frame(columns_body), orjson_response),
+    }
+
+    results, reference = {}, None
+    for name, (parse, render) in variants.items():
+        validate_s, df = timed(parse, args.repeats)
+        labels, probabilities = Infer(df, artifacts=artifacts).predict_with_proba()
+        serialize_s, body = timed(lambda: render(labels, probabilities), args.repeats)
+
+        decoded = json.loads(body)
+        if reference is None:
+            reference = decoded
+        elif decoded["predictions"] != reference["predictions"] or not np.allclose(
+            decoded["probabilities"], reference["probabilities"]
+        ):
+            raise AssertionError(f"{name} scores differ from the legacy path")
+
+        results[name] = {
+            "validate_ms": validate_s * 1e3,
+            "serialize_ms": serialize_s * 1e3,
+            "total_ms": (validate_s + serialize_s) * 1e3,
+            "body_mb": len(rows_body if name != "columns" else columns_body) / 2**20,
+        }
+
+    print(f"{args.rows:,} claims; same predictions and probabilities in every variant")
+    print(
+        f"{'':10s}{'validate ms':>13s}{'serialize ms':>14s}{'total ms':>10s}"
+        f"{'speedup':>9s}{'body MB':>9s}"
+    )
+    base = results["before"]["total_ms"]
+    for name, r in results.items():
+        print(
+            f"{name:10s}{r['validate_ms']:13.1f}{r['serialize_ms']:14.1f}"
+            f"{r['total_ms']:10.1f}{base / r['total_ms']:8.1f}x{r['body_mb']:9.2f}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
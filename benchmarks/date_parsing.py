@@ -0,0 +1,92 @@
+"""Throughput of `preprocess.dates.parse_dates` vs `pd.to_datetime(format="mixed")`.
+
+Builds `--rows` date values shaped like the claims data (a/b/yyyy strings,
+datetime objects as read from the Excel sheet, epoch-ms integers as sent to
+the API) and times both parsers on each mix.
+"""
+
+import argparse
+import datetime
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from preprocess.dates import parse_dates
+
+
+def make_values(rows: int, kind: str, seed: int = 42) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    days = rng.integers(18_000, 20_000, size=rows)  # 2019..2024
+    stamps = pd.to_datetime(days, unit="D")
+
+    if kind == "strings":
+        return pd.Series(stamps.strftime("%d/%m/%Y"), dtype=object)
+    if kind == "epoch_ms":
+        return pd.Series(days.astype(np.int64) * 86_400_000)
+
+    # sheet-like: strings mixed with datetime objects
+    values = np.empty(rows, dtype=object)
+    as_str = rng.random(rows) < 0.55
+    values[as_str] = stamps[as_str].strftime("%d/%m/%Y")
+    values[~as_str] = [
+        datetime.datetime(t.year, t.month, t.day) for t in stamps[~as_str]
+    ]
+    return pd.Series(values)
+
+
+def legacy(values: pd.Series) -> np.ndarray:
+    parsed = pd.to_datetime(values, format="mixed")
+    return np.column_stack([parsed.dt.year, parsed.dt.month, parsed.dt.day]).astype(
+        float
+    )
+
+
+def best_of(fn, values, repeat):
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn(values)
+        times.append(time.perf_counter() - t)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    print(
+        f"{'mix':12s}{'mixed (rows/s)':>18s}{'vectorized (rows/s)':>22s}{'speedup':>10s}"
+    )
+    for kind in ("strings", "sheet", "epoch_ms"):
+        values = make_values(args.rows, kind)
+
+        # epoch-ms semantics intentionally differ (pandas reads bare ints as ns)
+        if kind != "epoch_ms":
+            assert np.array_equal(legacy(values), parse_dates(values))
+
+        t_old = best_of(legacy, values, args.repeat)
+        t_new = best_of(parse_dates, values, args.repeat)
+        results[kind] = {
+            "mixed_rows_per_s": args.rows / t_old,
+            "vectorized_rows_per_s": args.rows / t_new,
+            "speedup": t_old / t_new,
+        }
+        r = results[kind]
+        print(
+            f"{kind:12s}{r['mixed_rows_per_s']:18,.0f}"
+            f"{r['vectorized_rows_per_s']:22,.0f}{r['speedup']:9.1f}x"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
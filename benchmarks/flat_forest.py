@@ -0,0 +1,88 @@
+"""scikit-learn forest vs the flat NumPy export: exactness and latency by batch size.
+
+Fits the random forest from `[model.random_forest]` on the training sheet,
+flattens it with `FlatForest.from_forest`, checks both give bit-identical
+probabilities on every batch, and times `predict_proba` per call at each
+`--sizes` batch size (claims resampled from the sheet).
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from config.settings import get_settings
+from inference.backends import get_backend
+from inference.flat import FlatForest
+from preprocess.ingest import load_dataset
+from preprocess.pipeline import FeaturePipeline
+
+settings = get_settings()
+
+
+def timed(fn, X, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 32, 1_000, 100_000])
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    backend = get_backend("random_forest")
+    df = load_dataset()
+    y = df[settings.target_col[0]].map(settings.target_mapping).to_numpy()
+    pipeline = FeaturePipeline(
+        encoding=backend.encoding, max_categories=backend.max_categories
+    ).fit(df)
+    forest = backend.finalize(backend.build().fit(pipeline.transform(df), y))
+    flat = FlatForest.from_forest(forest)
+    print(f"{flat.n_trees} trees, {flat.n_nodes:,} nodes")
+
+    claims = df.sample(
+        n=max(args.sizes), replace=True, random_state=settings.random_state
+    )
+    X_all = pipeline.transform(claims)
+
+    results = {}
+    for size in args.sizes:
+        X = X_all[:size]
+        if not np.array_equal(forest.predict_proba(X), flat.predict_proba(X)):
+            raise AssertionError(f"flat forest differs from sklearn at batch {size}")
+        repeats = max(3, min(200, 20_000 // size))
+        sklearn_s = timed(forest.predict_proba, X, repeats)
+        flat_s = timed(flat.predict_proba, X, repeats)
+        results[size] = {
+            "sklearn_ms": sklearn_s * 1e3,
+            "flat_ms": flat_s * 1e3,
+            "sklearn_rows_per_s": size / sklearn_s,
+            "flat_rows_per_s": size / flat_s,
+            "speedup": sklearn_s / flat_s,
+        }
+
+    print("identical probabilities at every batch size")
+    print(
+        f"{'batch':>8s}{'sklearn ms':>14s}{'flat ms':>12s}"
+        f"{'sklearn rows/s':>18s}{'flat rows/s':>14s}{'speedup':>10s}"
+    )
+    for size, r in results.items():
+        print(
+            f"{size:8d}{r['sklearn_ms']:14.2f}{r['flat_ms']:12.2f}"
+            f"{r['sklearn_rows_per_s']:18,.0f}{r['flat_rows_per_s']:14,.0f}"
+            f"{r['speedup']:9.1f}x"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
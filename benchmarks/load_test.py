@@ -0,0 +1,159 @@
+"""In-process load test of `/predict`, `/batch-predict` and `/explian`.
+
+Runs the real FastAPI app (lifespan, middleware, validation, micro-batching,
+explanation cache) behind `httpx.ASGITransport`, with the OpenAI client
+pointed at `benchmarks.mock_openai` the same way, so no sockets, API key or
+token cost are involved and the stub's `--llm-latency` stands in for the
+provider. Each endpoint gets `--requests` synthetic claims (see
+`benchmarks.synthetic`) from `--concurrency` closed-loop clients, and
+reports throughput and p50/p95/p99 latency. Train first, or the app trains
+on startup.
+
+    python -m benchmarks.load_test --concurrency 64 --llm-latency 0.5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Dict, List
+
+import httpx
+import numpy as np
+
+from benchmarks.synthetic import synthetic_claims
+
+ENDPOINTS = ("predict", "batch-predict", "explian")
+
+
+async def drive(client: httpx.AsyncClient, path: str, bodies: List, concurrency: int):
+    """Send every body from `concurrency` clients; (latencies, errors, wall seconds)."""
+    latencies, errors = [], 0
+    queue = iter(bodies)
+
+    async def worker():
+        nonlocal errors
+        for body in queue:
+            start = time.perf_counter()
+            response = await client.post(path, json=body)
+            latencies.append(time.perf_counter() - start)
+            errors += response.status_code != 200
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def summarize(latencies, errors: int, wall: float, rows_per_request: int = 1) -> dict:
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1e3
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_s": len(latencies) / wall,
+        "rows_per_s": len(latencies) * rows_per_request / wall,
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+    }
+
+
+def bodies_for(endpoint: str, claims: List[dict], batch_size: int) -> List:
+    if endpoint == "batch-predict":
+        return [
+            claims[i : i + batch_size]
+            for i in range(0, len(claims) - batch_size + 1, batch_size)
+        ]
+    if endpoint == "explian":
+        return [dict(claim, decision="COMPLETED") for claim in claims]
+    return claims
+
+
+async def run_load(
+    endpoints=ENDPOINTS,
+    requests: int = 2000,
+    concurrency: int = 64,
+    batch_size: int = 100,
+    llm_latency: float = 0.5,
+    seed: int = 42,
+) -> Dict[str, dict]:
+    # Any key will do: the transport below never leaves the process
+    os.environ.setdefault("OPENAI_API_KEY", "load-test")
+    from app import app
+    from benchmarks import mock_openai
+    from inference.readiness import readiness
+    from llm import llm_client
+
+    mock_openai.app.state.latency = llm_latency
+    llm_client.transport = httpx.ASGITransport(app=mock_openai.app)
+
+    results = {}
+    async with app.router.lifespan_context(app):
+        while not readiness.ready:
+            if readiness.phase == "failed":
+                raise RuntimeError(f"model startup failed: {readiness.error}")
+            await asyncio.sleep(0.1)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://load-test", timeout=120
+        ) as client:
+            for k, endpoint in enumerate(endpoints):
+                count = requests * (batch_size if endpoint == "batch-predict" else 1)
+                # Fresh claims per endpoint, so /explian isn't served from cache
+                claims = synthetic_claims(count, seed=seed + k)
+                bodies = bodies_for(endpoint, claims, batch_size)
+                # Warm-up: first-call costs (imports, pools) aren't throughput
+                await drive(client, f"/{endpoint}", bodies[:concurrency], concurrency)
+                latencies, errors, wall = await drive(
+                    client, f"/{endpoint}", bodies, concurrency
+                )
+                rows = batch_size if endpoint == "batch-predict" else 1
+                results[endpoint] = summarize(latencies, errors, wall, rows)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--endpoints", nargs="+", default=list(ENDPOINTS))
+    parser.add_argument("--requests", type=int, default=2000, help="per endpoint")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=100, help="/batch-predict")
+    parser.add_argument(
+        "--llm-latency", type=float, default=0.5, help="stub seconds per completion"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(
+        run_load(
+            args.endpoints,
+            args.requests,
+            args.concurrency,
+            args.batch_size,
+            args.llm_latency,
+            args.seed,
+        )
+    )
+
+    print(f"{args.concurrency} clients, {args.requests} requests per endpoint")
+    print(
+        f"{'endpoint':>14s}{'req/s':>10s}{'rows/s':>10s}"
+        f"{'p50 ms':>9s}{'p95 ms':>9s}{'p99 ms':>9s}{'errors':>8s}"
+    )
+    for endpoint, r in results.items():
+        print(
+            f"{endpoint:>14s}{r['requests_per_s']:10,.0f}{r['rows_per_s']:10,.0f}"
+            f"{r['p50_ms']:9.1f}{r['p95_ms']:9.1f}{r['p99_ms']:9.1f}{r['errors']:8d}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
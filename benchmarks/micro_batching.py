@@ -0,0 +1,123 @@
+"""/predict with and without micro-batching: throughput and latency under concurrency.
+
+Loads the trained artifacts, then for each `--concurrency` level keeps that
+many single-claim predictions in flight on one event loop (as concurrent
+`/predict` requests would be inside a worker) for `--requests` calls in
+total. "direct" scores every call on its own in the thread pool, as
+`/predict` did before batching; "batched" submits to a `MicroBatcher`
+with `[batching]` settings (or `--max-batch-size` / `--max-wait-ms`).
+Train first.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+from prometheus_client import REGISTRY
+from starlette.concurrency import run_in_threadpool
+
+from config.settings import get_settings
+from inference import Infer
+from inference.microbatch import MicroBatcher
+from inference.registry import registry
+from preprocess.ingest import load_dataset
+
+settings = get_settings()
+
+
+async def drive(score, records, concurrency: int) -> dict:
+    latencies = []
+    queue = iter(records)
+
+    async def client():
+        for record in queue:
+            start = time.perf_counter()
+            await score(record)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+    return {
+        "requests_per_s": len(records) / wall,
+        "p50_ms": float(np.percentile(latencies, 50)) * 1e3,
+        "p99_ms": float(np.percentile(latencies, 99)) * 1e3,
+    }
+
+
+def _batch_counts():
+    # (claims, batches) so far; the histogram is process-wide, so take deltas
+    return tuple(
+        REGISTRY.get_sample_value(f"claims_microbatch_size_{suffix}") or 0.0
+        for suffix in ("sum", "count")
+    )
+
+
+async def measure(records, concurrency: int, args) -> dict:
+    artifacts = registry.get()
+    direct = await drive(
+        lambda r: run_in_threadpool(Infer.predict_record_proba, r, artifacts),
+        records,
+        concurrency,
+    )
+
+    batches = _batch_counts()
+    batcher = MicroBatcher(args.max_batch_size, args.max_wait_ms)
+    batcher.start()
+    try:
+        batched = await drive(batcher.submit, records, concurrency)
+    finally:
+        await batcher.aclose()
+    claims, count = (now - before for now, before in zip(_batch_counts(), batches))
+    batched["mean_batch_size"] = claims / count if count else 0.0
+    return {"direct": direct, "batched": batched}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 64, 200])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument(
+        "--max-batch-size", type=int, default=settings.batching_max_batch_size
+    )
+    parser.add_argument(
+        "--max-wait-ms", type=float, default=settings.batching_max_wait_ms
+    )
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    registry.load()
+    claims = load_dataset(settings.FIELD_ORDER).sample(
+        n=args.requests, replace=True, random_state=settings.random_state
+    )
+    # Requests carry None, not NaN, for missing fields
+    claims = claims.astype(object)
+    records = claims.where(claims.notna(), None).to_dict("records")
+
+    results = {c: asyncio.run(measure(records, c, args)) for c in args.concurrency}
+
+    print(
+        f"max_batch_size={args.max_batch_size} max_wait_ms={args.max_wait_ms}, "
+        f"{args.requests} requests per run"
+    )
+    print(
+        f"{'in flight':>10s}{'direct req/s':>14s}{'p50 ms':>9s}{'p99 ms':>9s}"
+        f"{'batched req/s':>15s}{'p50 ms':>9s}{'p99 ms':>9s}{'batch':>8s}"
+    )
+    for c, r in results.items():
+        d, b = r["direct"], r["batched"]
+        print(
+            f"{c:10d}{d['requests_per_s']:14,.0f}{d['p50_ms']:9.2f}{d['p99_ms']:9.2f}"
+            f"{b['requests_per_s']:15,.0f}{b['p50_ms']:9.2f}{b['p99_ms']:9.2f}"
+            f"{b['mean_batch_size']:8.1f}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
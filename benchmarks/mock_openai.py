@@ -0,0 +1,187 @@
+"""Local stand-in for the OpenAI chat completions API.
+
+Answers `POST /v1/chat/completions` after a configurable delay with a canned
+explanation, so `/explian` can be exercised and load-tested without an API
+key or token cost:
+
+    python -m benchmarks.mock_openai --port 8001 --latency 2.0
+    OPENAI_API_KEY=test OPENAI_BASE_URL=http://127.0.0.1:8001/v1 uvicorn app:app
+
+`--latency` is the time to the first token. With `--tokens-per-second` the
+rest of the completion takes as long as it would to generate, and
+`"stream": true` requests get it as SSE chunks at that rate (`/stats`
+counts streams the client abandoned). `--error-rate` makes that fraction of
+requests fail with 429/500 to exercise the client's retry/backoff.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+app = FastAPI()
+app.state.latency = 1.0
+app.state.jitter = 0.0
+app.state.error_rate = 0.0
+app.state.tokens_per_second = 0.0
+app.state.requests = 0
+app.state.streams_abandoned = 0
+app.state.tokens_streamed = 0
+
+
+def canned_explanation(messages) -> str:
+    prompt = (messages[-1].get("content") or "") if messages else ""
+    declined = re.search(r'decision"?:\s*"?DECLINED', prompt)
+    decision = "DECLINED" if declined else "COMPLETED"
+    return json.dumps(
+        {
+            "decision": decision,
+            "summary": f"Mock explanation: the claim was {decision.lower()}.",
+            "key_factors": [],
+            "policy_checks": {},
+            "excess_fee_note": None,
+            "data_gaps": [],
+            "suggested_next_steps": [],
+            "confidence": 0.5,
+        }
+    )
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    app.state.requests += 1
+
+    delay = app.state.latency + random.uniform(0, app.state.jitter)
+    await asyncio.sleep(delay)
+
+    if random.random() < app.state.error_rate:
+        status = random.choice([429, 500])
+        return JSONResponse(
+            {"error": {"message": "mock failure", "type": "mock", "code": status}},
+            status_code=status,
+        )
+
+    content = canned_explanation(body.get("messages", []))
+    # ~4 characters per token
+    tokens = [content[i : i + 4] for i in range(0, len(content), 4)]
+    model = body.get("model", "mock")
+
+    prompt_tokens = sum(len(m.get("content") or "") for m in body["messages"]) // 4
+    usage = {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": len(tokens),
+        "total_tokens": prompt_tokens + len(tokens),
+    }
+
+    if body.get("stream"):
+        include_usage = (body.get("stream_options") or {}).get("include_usage")
+        return StreamingResponse(
+            stream_chunks(tokens, model, usage if include_usage else None),
+            media_type="text/event-stream",
+        )
+
+    if app.state.tokens_per_second:
+        await asyncio.sleep(len(tokens) / app.state.tokens_per_second)
+
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": usage,
+    }
+
+
+async def stream_chunks(tokens, model, usage=None):
+    chunk_id = f"chatcmpl-{uuid.uuid4().hex}"
+    created = int(time.time())
+
+    def chunk(delta, finish_reason=None):
+        data = {
+            "id": chunk_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        return f"data: {json.dumps(data)}\n\n"
+
+    completed = False
+    try:
+        yield chunk({"role": "assistant", "content": ""})
+        for i, token in enumerate(tokens):
+            if i and app.state.tokens_per_second:
+                await asyncio.sleep(1 / app.state.tokens_per_second)
+            app.state.tokens_streamed += 1
+            yield chunk({"content": token})
+        yield chunk({}, "stop")
+        if usage is not None:
+            # What OpenAI sends for stream_options.include_usage: no choices
+            data = {
+                "id": chunk_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [],
+                "usage": usage,
+            }
+            yield f"data: {json.dumps(data)}\n\n"
+        yield "data: [DONE]\n\n"
+        completed = True
+    finally:
+        if not completed:
+            app.state.streams_abandoned += 1
+
+
+@app.get("/stats")
+def stats() -> dict:
+    return {
+        "requests": app.state.requests,
+        "streams_abandoned": app.state.streams_abandoned,
+        "tokens_streamed": app.state.tokens_streamed,
+    }
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument(
+        "--latency", type=float, default=1.0, help="seconds per completion"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="extra random seconds"
+    )
+    parser.add_argument(
+        "--tokens-per-second", type=float, default=0.0, help="0 = instant after latency"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    app.state.latency = args.latency
+    app.state.jitter = args.jitter
+    app.state.error_rate = args.error_rate
+    app.state.tokens_per_second = args.tokens_per_second
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Model backends side by side: training time, artifact size, latency, throughput.
+
+Fits every backend in `inference.backends` on the same train split (each with
+its own `FeaturePipeline` encoding and `[model.<backend>]` hyperparameters),
+then measures what serving pays for it: pickled model size, single-claim
+latency through `transform_record` (the `/predict` path) and batch throughput
+through `transform` on `--rows` resampled claims (the `/batch-predict` path).
+"""
+
+import argparse
+import json
+import pickle
+import time
+
+import numpy as np
+from sklearn import metrics
+from sklearn.model_selection import train_test_split
+
+from config.settings import get_settings
+from inference.backends import BACKENDS
+from preprocess.ingest import load_dataset
+from preprocess.pipeline import FeaturePipeline
+
+settings = get_settings()
+
+
+def measure_backend(backend, train_df, test_df, batch_df, y_train, y_test, args):
+    pipeline = FeaturePipeline(
+        encoding=backend.encoding, max_categories=backend.max_categories
+    ).fit(train_df)
+    X_train = pipeline.transform(train_df)
+
+    model = backend.build(pipeline.categorical_mask_)
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_s = time.perf_counter() - start
+    model = backend.finalize(model)
+
+    proba = backend.predict_proba(model, pipeline.transform(test_df))[:, 1]
+
+    # Requests carry None, not NaN, for missing fields
+    head = test_df.head(args.single).astype(object)
+    records = head.where(head.notna(), None).to_dict("records")
+    for record in records[:10]:  # warm-up
+        backend.predict_proba(model, pipeline.transform_record(record))
+    timings = []
+    for record in records:
+        start = time.perf_counter()
+        backend.predict_proba(model, pipeline.transform_record(record))
+        timings.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    backend.predict_proba(model, pipeline.transform(batch_df))
+    batch_s = time.perf_counter() - start
+
+    return {
+        "features": pipeline.n_features_,
+        "fit_s": fit_s,
+        "model_mb": len(pickle.dumps(model)) / 2**20,
+        "nodes": backend.n_nodes(model),
+        "single_row_ms": float(np.median(timings)) * 1e3,
+        "single_row_p95_ms": float(np.percentile(timings, 95)) * 1e3,
+        "batch_rows_per_s": len(batch_df) / batch_s,
+        "test_roc_auc": metrics.roc_auc_score(y_test, proba),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000, help="batch size")
+    parser.add_argument("--single", type=int, default=500, help="single-row calls")
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    df = load_dataset()
+    y = df[settings.target_col[0]].map(settings.target_mapping).to_numpy()
+    train_df, test_df, y_train, y_test = train_test_split(
+        df,
+        y,
+        test_size=settings.test_size,
+        random_state=settings.random_state,
+        stratify=y,
+    )
+    batch_df = df.sample(
+        n=args.rows, replace=True, random_state=settings.random_state
+    ).reset_index(drop=True)
+
+    results = {}
+    for name, backend in BACKENDS.items():
+        print(f"📌 {name}...")
+        results[name] = measure_backend(
+            backend, train_df, test_df, batch_df, y_train, y_test, args
+        )
+
+    names = list(results)
+    print(f"{'':20s}" + "".join(f"{name:>24s}" for name in names))
+    for key in results[names[0]]:
+        print(f"{key:20s}" + "".join(f"{results[n][key]:24.3f}" for n in names))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Input tokens per `/explian` request: previous prompt vs `llm.prompts`.
+
+Builds both prompts for every claim in the training sheet (status mapped to
+the decision) and reports prompt size and build time. Tokens are counted with
+tiktoken's o200k_base (the GPT-4o tokenizer) when it is installed and its
+encoding is available, otherwise estimated at ~4 characters per token.
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from config.settings import get_settings
+from llm.prompts import approx_tokens, build_chatgpt_prompts
+
+settings = get_settings()
+
+
+def legacy_prompts(record):
+    glossary_text = "\n".join(
+        f"- **{k}**: {v}" for k, v in settings.COLUMN_GLOSSARY.items()
+    )
+    system_prompt = (
+        "You are an impartial insurance claims reviewer. The system has already decided "
+        "to COMPLETED or DECLINED each claim. Your job is to explain that decision clearly, "
+        "concisely, and defensibly using only the provided fields. Do not re-decide the outcome, "
+        "and do not invent facts. If information is missing, say so."
+    )
+    user_prompt = f"""
+You are given:
+
+1) Column meanings:
+{glossary_text}
+
+2) The claim record (JSON). It already contains the final decision under "decision".
+Use ONLY this data to explain why the claim was accepted or rejected.
+
+```json
+{json.dumps(record, ensure_ascii=False, indent=2, default=str)}
+"""
+    return system_prompt, user_prompt
+
+
+def token_counter():
+    try:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding("o200k_base")
+        return "o200k_base", lambda text: len(encoding.encode(text))
+    except Exception:
+        return "~4 chars/token", approx_tokens
+
+
+def load_records(rows: int):
+    df = pd.read_excel(settings.data_path)
+    if rows:
+        df = df.head(rows)
+    decisions = {v: k.upper() for k, v in settings.target_mapping.items()}
+    status = df[settings.target_col[0]].map(settings.target_mapping)
+
+    df = df.reindex(columns=settings.FIELD_ORDER).astype(object)
+    df = df.where(df.notna(), None)
+    records = df.to_dict(orient="records")
+    for record, s in zip(records, status):
+        record["decision"] = decisions.get(s, "COMPLETED")
+    return records
+
+
+def measure(builder, records, count):
+    system_tokens, user_tokens = [], []
+    t = time.perf_counter()
+    prompts = [builder(r) for r in records]
+    build_us = (time.perf_counter() - t) / len(records) * 1e6
+
+    for system_prompt, user_prompt in prompts:
+        system_tokens.append(count(system_prompt))
+        user_tokens.append(count(user_prompt))
+    system_tokens = np.array(system_tokens)
+    user_tokens = np.array(user_tokens)
+    total = system_tokens + user_tokens
+    return {
+        "system_tokens": float(system_tokens.mean()),
+        "user_tokens_mean": float(user_tokens.mean()),
+        "total_tokens_mean": float(total.mean()),
+        "total_tokens_p95": float(np.percentile(total, 95)),
+        "total_tokens_max": int(total.max()),
+        "build_us": build_us,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=0, help="0 = the whole sheet")
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    records = load_records(args.rows)
+    tokenizer, count = token_counter()
+
+    results = {
+        "legacy": measure(legacy_prompts, records, count),
+        "compact": measure(build_chatgpt_prompts, records, count),
+    }
+
+    print(f"{len(records)} claims, tokens counted with {tokenizer}")
+    print(
+        f"{'prompt':10s}{'system':>10s}{'user':>10s}{'total':>10s}"
+        f"{'p95':>10s}{'max':>10s}{'build (us)':>12s}"
+    )
+    for name, r in results.items():
+        print(
+            f"{name:10s}{r['system_tokens']:10.0f}{r['user_tokens_mean']:10.0f}"
+            f"{r['total_tokens_mean']:10.0f}{r['total_tokens_p95']:10.0f}"
+            f"{r['total_tokens_max']:10d}{r['build_us']:12.1f}"
+        )
+    saved = (
+        1
+        - results["compact"]["total_tokens_mean"]
+        / results["legacy"]["total_tokens_mean"]
+    )
+    print(f"📌 {saved:.0%} fewer input tokens per request")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(
+                {"args": vars(args), "tokenizer": tokenizer, "results": results},
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
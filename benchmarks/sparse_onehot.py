@@ -0,0 +1,98 @@
+"""Dense vs sparse one-hot feature matrices: memory and time.
+
+Resamples the training sheet to `--rows` claims and widens `productDesc` and
+`retailerName` to `--cardinality` synthetic categories each (the high-cardinality case
+the sparse path exists for), then measures `FeaturePipeline.transform` and
+forest fit/predict with both layouts.
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from config.settings import get_settings
+from preprocess.ingest import load_dataset
+from preprocess.pipeline import FeaturePipeline
+
+settings = get_settings()
+
+
+def make_claims(rows: int, cardinality: int, seed: int) -> pd.DataFrame:
+    source = load_dataset()
+    rng = np.random.default_rng(seed)
+    df = source.sample(n=rows, replace=True, random_state=seed).reset_index(drop=True)
+    for col in ("productDesc", "retailerName"):
+        codes = rng.integers(0, cardinality, size=rows)
+        df[col] = pd.Series(codes).map(lambda k: f"{col} #{k}")
+    return df
+
+
+def nbytes(X) -> int:
+    if isinstance(X, np.ndarray):
+        return X.nbytes
+    return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+
+
+def measure(fn):
+    tracemalloc.start()
+    t = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - t
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--cardinality", type=int, default=500)
+    parser.add_argument("--train-rows", type=int, default=20_000)
+    parser.add_argument("--trees", type=int, default=50)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    df = make_claims(args.rows, args.cardinality, settings.random_state)
+    y = df[settings.target_col[0]].map(settings.target_mapping).to_numpy()
+    pipeline = FeaturePipeline().fit(df)
+    print(f"{args.rows} claims, {pipeline.n_features_} features")
+
+    results = {}
+    for mode in ("dense", "sparse"):
+        sparse = mode == "sparse"
+        X, t_transform, peak = measure(lambda: pipeline.transform(df, sparse=sparse))
+
+        model = RandomForestClassifier(
+            n_estimators=args.trees, random_state=settings.random_state, n_jobs=-1
+        )
+        _, t_fit, _ = measure(
+            lambda: model.fit(X[: args.train_rows], y[: args.train_rows])
+        )
+        t = time.perf_counter()
+        model.predict(X)
+        t_predict = time.perf_counter() - t
+
+        results[mode] = {
+            "matrix_mb": nbytes(X) / 1e6,
+            "transform_peak_mb": peak / 1e6,
+            "transform_s": t_transform,
+            "fit_s": t_fit,
+            "predict_s": t_predict,
+        }
+
+    print(f"{'':20s}{'dense':>12s}{'sparse':>12s}")
+    for key in results["dense"]:
+        print(f"{key:20s}{results['dense'][key]:12.3f}{results['sparse'][key]:12.3f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""The whole benchmark suite, written as one JSON file comparable across runs.
+
+Micro-benchmarks, on synthetic claims (`benchmarks.synthetic`) and the
+served artifacts (train first):
+- request validation and DataFrame construction, per claim
+- each `FeaturePipeline.transform` block (the `claims_stage_seconds`
+  telemetry stages) and the single-claim `transform_record`
+- the model at batch sizes 1 to 100k, and the calibrated `Infer` pass
+- fitting the pipeline and model on the training sheet (`--skip-train` to omit)
+
+Then the in-process load test (`benchmarks.load_test`; `--skip-load` to
+omit) adds throughput and p50/p95/p99 for `/predict`, `/batch-predict` and
+`/explian` against the latency-simulating OpenAI stub.
+
+Every metric is stored with its unit and whether lower or higher is better.
+With `--baseline`, the run is compared against a previous output. Metrics
+worse by more than `--tolerance` are listed as regressions, and the exit
+status is 1 if there are any.
+
+    python -m benchmarks.suite --output bench.json
+    python -m benchmarks.suite --output new.json --baseline bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Callable, Dict
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+from benchmarks.load_test import ENDPOINTS, run_load
+from benchmarks.synthetic import synthetic_claims
+from config.settings import ROOT, get_settings
+from inference import Infer
+from inference.registry import registry
+from models import MLClaimDataRequest
+from telemetry import STAGE_SECONDS
+
+settings = get_settings()
+
+BATCH_SIZES = (1, 10, 100, 1_000, 10_000, 100_000)
+
+
+def metric(value: float, unit: str, better: str) -> dict:
+    return {"value": float(value), "unit": unit, "better": better}
+
+
+def per_call(fn: Callable, min_seconds: float = 0.5, max_calls: int = 10_000) -> float:
+    """Median seconds per call, over enough calls to fill about `min_seconds`."""
+    fn()  # warm-up
+    start = time.perf_counter()
+    fn()
+    once = max(time.perf_counter() - start, 1e-7)
+    calls = int(min(max_calls, max(5, min_seconds / once)))
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+
+def stage_sums() -> Dict[str, float]:
+    return {
+        sample.labels["stage"]: sample.value
+        for family in STAGE_SECONDS.collect()
+        for sample in family.samples
+        if sample.name.endswith("_sum")
+    }
+
+
+def micro(claims, rows: int, skip_train: bool) -> Dict[str, dict]:
+    out = {}
+    artifacts = registry.load()
+    pipeline = artifacts.pipeline
+
+    sample = claims[:1000]
+    validate_s = per_call(
+        lambda: [MLClaimDataRequest.model_validate(c) for c in sample], max_calls=20
+    )
+    out["validate_us_per_claim"] = metric(validate_s / len(sample) * 1e6, "us", "lower")
+    records = [MLClaimDataRequest.model_validate(c).model_dump() for c in claims]
+
+    frame_s = per_call(
+        lambda: pd.DataFrame(records[:10_000]).reindex(columns=settings.FIELD_ORDER),
+        max_calls=20,
+    )
+    out["dataframe_us_per_claim"] = metric(
+        frame_s / min(rows, 10_000) * 1e6, "us", "lower"
+    )
+    df = pd.DataFrame(records).reindex(columns=settings.FIELD_ORDER)
+
+    # Per-block times of the real transform, read back from its stage timers
+    repeats = 5
+    before = stage_sums()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        X = pipeline.transform(df, sparse=settings.sparse_onehot)
+    total = time.perf_counter() - start
+    after = stage_sums()
+    out["transform_rows_per_s"] = metric(len(df) * repeats / total, "rows/s", "higher")
+    for name, seconds in after.items():
+        spent = (seconds - before.get(name, 0.0)) / (repeats * len(df))
+        # Blocks this encoding doesn't use still run their (empty) timer
+        if name.startswith("preprocess.") and spent * len(df) > 1e-5:
+            block = name.split(".", 1)[1]
+            out[f"transform_{block}_ns_per_row"] = metric(spent * 1e9, "ns", "lower")
+
+    out["transform_record_us"] = metric(
+        per_call(lambda: pipeline.transform_record(records[0])) * 1e6, "us", "lower"
+    )
+
+    for size in BATCH_SIZES:
+        if size > len(df):
+            break
+        X_size = X[:size]
+        model_s = per_call(
+            lambda: artifacts.backend.predict_proba(artifacts.model, X_size),
+            max_calls=200,
+        )
+        infer_s = per_call(
+            lambda: Infer.predict_features_proba(X_size, artifacts), max_calls=200
+        )
+        out[f"model_predict_ms_batch_{size}"] = metric(model_s * 1e3, "ms", "lower")
+        out[f"infer_rows_per_s_batch_{size}"] = metric(
+            size / infer_s, "rows/s", "higher"
+        )
+
+    if not skip_train:
+        from inference.backends import get_backend
+        from preprocess import Preprocessor
+
+        start = time.perf_counter()
+        preprocess = Preprocessor.from_dataset()
+        X_train, y_train = preprocess.fit_transform()
+        out["train_preprocess_s"] = metric(time.perf_counter() - start, "s", "lower")
+
+        backend = get_backend()
+        start = time.perf_counter()
+        backend.build(preprocess.pipeline.categorical_mask_).fit(X_train, y_train)
+        out["train_fit_s"] = metric(time.perf_counter() - start, "s", "lower")
+    return out
+
+
+def load(args) -> Dict[str, dict]:
+    results = asyncio.run(
+        run_load(
+            ENDPOINTS,
+            args.requests,
+            args.concurrency,
+            args.batch_size,
+            args.llm_latency,
+            args.seed,
+        )
+    )
+    out = {}
+    for endpoint, r in results.items():
+        name = endpoint.replace("-", "_")
+        rate = "rows_per_s" if endpoint == "batch-predict" else "requests_per_s"
+        out[f"load_{name}_{rate}"] = metric(
+            r[rate], rate.replace("_per_", "/"), "higher"
+        )
+        for p in ("p50_ms", "p95_ms", "p99_ms"):
+            out[f"load_{name}_{p}"] = metric(r[p], "ms", "lower")
+        out[f"load_{name}_errors"] = metric(r["errors"], "count", "lower")
+    return out
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+        "cpus": os.cpu_count(),
+        "machine": platform.machine(),
+        "model_backend": settings.model_backend,
+        "model_engine": settings.model_engine,
+        "batching": [settings.batching_max_batch_size, settings.batching_max_wait_ms],
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    """Print current vs baseline per metric; return the regressed metric names."""
+    regressions = []
+    print(f"\n{'metric':44s}{'baseline':>14s}{'current':>14s}{'change':>10s}")
+    for name, m in current["metrics"].items():
+        base = baseline["metrics"].get(name)
+        if base is None:
+            print(f"{name:44s}{'-':>14s}{m['value']:14.4g}{'new':>10s}")
+            continue
+        old, new = base["value"], m["value"]
+        change = (new - old) / old if old else 0.0
+        worse = change > tolerance if m["better"] == "lower" else change < -tolerance
+        # An absolute count (errors) regresses as soon as it goes up
+        if m["unit"] == "count":
+            worse = new > old
+        flag = "  REGRESSION" if worse else ""
+        print(f"{name:44s}{old:14.4g}{new:14.4g}{change:+9.1%}{flag}")
+        if worse:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, default=100_000, help="synthetic claims")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-train", action="store_true")
+    parser.add_argument("--skip-load", action="store_true")
+    parser.add_argument("--requests", type=int, default=2000, help="load, per endpoint")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--output", "-o", help="write results as JSON")
+    parser.add_argument("--baseline", help="previous --output to compare against")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.10, help="allowed change (0.10 = 10%%)"
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    claims = synthetic_claims(args.rows, seed=args.seed)
+    metrics = micro(claims, args.rows, args.skip_train)
+    if not args.skip_load:
+        metrics.update(load(args))
+
+    current = {
+        "environment": environment(),
+        "args": vars(args),
+        "seconds": time.perf_counter() - start,
+        "metrics": metrics,
+    }
+
+    print(f"{'metric':44s}{'value':>14s}  unit")
+    for name, m in metrics.items():
+        print(f"{name:44s}{m['value']:14.4g}  {m['unit']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"\n✅ Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        changed = {
+            key: (value, current["environment"].get(key))
+            for key, value in baseline["environment"].items()
+            if key != "commit" and current["environment"].get(key) != value
+        }
+        if changed:
+            print("📌 Baseline was recorded in a different environment:")
+            for key, (old, new) in changed.items():
+                print(f"   {key}: {old} -> {new}")
+        regressions = compare(current, baseline, args.tolerance)
+        if regressions:
+            print(
+                f"\n❌ {len(regressions)} metric(s) regressed beyond {args.tolerance:.0%}"
+            )
+            sys.exit(1)
+        print(f"\n✅ No regressions beyond {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Synthetic claims shaped like `SAMPLE_DEFAULT` / `data.json`, at any volume.
+
+Every field is drawn independently (seeded) from that column's values in
+the training sheet, missing values included, and typed the way API clients
+send them: floats for amounts and device checks, epoch milliseconds for
+dates, None for missing. Free-text fields come from `SAMPLE_DEFAULT`. The
+claims are realistic for the encoders and the model (every category was
+seen in training) without copying any real claim.
+
+    python -m benchmarks.synthetic --rows 100000 --output claims.ndjson
+"""
+
+import argparse
+import json
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config.settings import get_settings
+from models import SAMPLE_DEFAULT
+from preprocess.ingest import load_dataset
+
+settings = get_settings()
+
+TEXT_FIELDS = ("other", "issueDesc")
+
+
+def _as_request_values(col: str, values: pd.Series) -> np.ndarray:
+    """A column's values as the Python objects a JSON request would carry."""
+    if col in settings.datetime_cols:
+        dates = pd.to_datetime(values)
+        epoch_ms = dates.astype("int64") // 1_000_000
+        return np.array(
+            [
+                None if missing else int(ms)
+                for ms, missing in zip(epoch_ms, dates.isna())
+            ],
+            dtype=object,
+        )
+    if pd.api.types.is_numeric_dtype(values):
+        cast = int if col == "deviceCost" else float
+        return np.array(
+            [None if pd.isna(v) else cast(v) for v in values.to_numpy()], dtype=object
+        )
+    return np.array(
+        [None if pd.isna(v) else str(v) for v in values.to_numpy(dtype=object)],
+        dtype=object,
+    )
+
+
+def synthetic_claims(
+    rows: int, seed: int = 42, source: Optional[pd.DataFrame] = None
+) -> List[dict]:
+    source = load_dataset() if source is None else source
+    rng = np.random.default_rng(seed)
+
+    columns = {}
+    for col in settings.FIELD_ORDER:
+        if col in TEXT_FIELDS or col not in source:
+            columns[col] = np.full(rows, SAMPLE_DEFAULT[col], dtype=object)
+            continue
+        pool = _as_request_values(col, source[col])
+        columns[col] = pool[rng.integers(0, len(pool), size=rows)]
+
+    return [{col: columns[col][i] for col in settings.FIELD_ORDER} for i in range(rows)]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", "-o", required=True, help="NDJSON file to write")
+    args = parser.parse_args()
+
+    with open(args.output, "w") as f:
+        for claim in synthetic_claims(args.rows, args.seed):
+            f.write(json.dumps(claim, ensure_ascii=False) + "\n")
+    print(f"✅ Wrote {args.rows:,} synthetic claims to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Resident memory and load time per worker: pickled forest vs memory-mapped flat arrays.
+
+Starts `--workers` processes at once (like `uvicorn --workers N`), each
+loading the trained artifacts through an `ArtifactRegistry` and scoring
+`--rows` claims so every tree page is touched. While all of them are alive,
+each reads its own /proc/self/smaps_rollup: RSS counts shared pages in full,
+PSS splits them between the processes mapping them, and "private" is what
+the worker alone pays for. Linux only; train first (a random forest
+release holds both the pickle and the flat export).
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import time
+
+ENGINES = ("sklearn", "flat")
+
+
+def memory_kb() -> dict:
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "private": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def worker(engine, rows, barrier, results):
+    from config.settings import get_settings
+    from inference import Infer
+    from inference.registry import ArtifactRegistry
+    from preprocess.ingest import load_dataset
+
+    settings = get_settings()
+    claims = load_dataset().sample(
+        n=rows, replace=True, random_state=settings.random_state
+    )
+    before = memory_kb()
+
+    registry = ArtifactRegistry(engine=engine, reload_interval=None)
+    start = time.perf_counter()
+    artifacts = registry.load()
+    load_s = time.perf_counter() - start
+    Infer(claims, artifacts=artifacts).predict()
+
+    # Measure only once every worker holds its model
+    barrier.wait()
+    after = memory_kb()
+    barrier.wait()
+    results.put(
+        {
+            "load_ms": load_s * 1e3,
+            **{f"{k}_mb": (after[k] - before[k]) / 1024 for k in after},
+            "total_rss_mb": after["rss"] / 1024,
+        }
+    )
+
+
+def measure(engine: str, workers: int, rows: int) -> dict:
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+    procs = [
+        ctx.Process(target=worker, args=(engine, rows, barrier, results))
+        for _ in range(workers)
+    ]
+    for p in procs:
+        p.start()
+    per_worker = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return {key: sum(r[key] for r in per_worker) / workers for key in per_worker[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    results = {name: measure(name, args.workers, args.rows) for name in ENGINES}
+
+    print(
+        f"{args.workers} workers; memory is the per-worker increase from loading + scoring"
+    )
+    print(f"{'':18s}" + "".join(f"{name:>12s}" for name in ENGINES))
+    for key in results[ENGINES[0]]:
+        print(f"{key:18s}" + "".join(f"{results[n][key]:12.2f}" for n in ENGINES))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
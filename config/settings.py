@@ -1,8 +1,36 @@
 import os
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+
 import toml
 
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _project_path(value) -> Path:
+    # Relative paths in config.toml are relative to the project root, not the cwd
+    path = Path(value)
+    return path if path.is_absolute() else ROOT / path
+
+
+def _freeze(value):
+    # Lists become tuples and tables read-only mappings, all the way down, so
+    # no module can change a setting another one has already read
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
 
 class Settings:
+    """config.toml as flat attributes. Read-only once loaded, including the
+    lists (tuples) and tables (read-only mappings) they hold.
+
+    Use `get_settings()`, which parses the file once per process; modules
+    only read attributes, so they can all share that one instance.
+    """
 
     def __init__(self):
 
@@ -13,9 +41,64 @@ class Settings:
             config = toml.load(file)
 
         self.data_path = config["path"]["data_path"]
-        self.model_save_path = config["path"]["model_save_path"]
+        self.data_cache_dir = _project_path(config["path"]["data_cache_dir"])
+        self.artifacts_dir = _project_path(config["path"]["artifacts_dir"])
         self.test_size = config["data"]["test_size"]
         self.random_state = config["random_state"]["seed"]
+        self.registry_reload_interval = config["registry"]["reload_interval"]
+        self.registry_keep_releases = config["registry"]["keep_releases"]
+        self.sparse_onehot = config["features"]["sparse_onehot"]
+        self.stream_chunk_size = config["stream"]["chunk_size"]
+        self.batching_max_batch_size = config["batching"]["max_batch_size"]
+        self.batching_max_wait_ms = config["batching"]["max_wait_ms"]
+        self.telemetry_profiling = config["telemetry"]["profiling"]
+
+        self.llm_model = config["llm"]["model"]
+        self.llm_temperature = config["llm"]["temperature"]
+        self.llm_max_tokens = config["llm"]["max_tokens"]
+        self.llm_max_concurrency = config["llm"]["max_concurrency"]
+        self.llm_timeout = config["llm"]["timeout"]
+        self.llm_max_retries = config["llm"]["max_retries"]
+        self.llm_base_url = config["llm"]["base_url"]
+
+        self.llm_prompt_text_fields = config["llm"]["prompt"]["text_fields"]
+        self.llm_prompt_text_token_budget = config["llm"]["prompt"]["text_token_budget"]
+
+        self.llm_cache_enabled = config["llm"]["cache"]["enabled"]
+        self.llm_cache_max_entries = config["llm"]["cache"]["max_entries"]
+        self.llm_cache_ttl = config["llm"]["cache"]["ttl"]
+        self.llm_cache_sqlite_path = config["llm"]["cache"]["sqlite_path"]
+
+        self.auto_approve_threshold = config["decision"]["auto_approve"]
+        self.auto_decline_threshold = config["decision"]["auto_decline"]
+
+        self.assess_explain_concurrency = config["assess"]["explain_concurrency"]
+        self.assess_explain_timeout = config["assess"]["explain_timeout"]
+
+        self.model_backend = config["model"]["backend"]
+        self.model_engine = config["model"]["engine"]
+        if self.model_engine not in ("auto", "flat", "sklearn"):
+            raise ValueError(
+                "[model] engine must be 'auto', 'flat' or 'sklearn', "
+                f"got {self.model_engine!r}"
+            )
+        self.model_bulk_rows = config["model"]["bulk_rows"]
+
+        # Each training run writes a complete artifact set into its own
+        # releases/<id>/ directory, then points release.json at it; the
+        # registry only ever watches release.json
+        self.releases_dir = self.artifacts_dir / "releases"
+        self.release_path = self.artifacts_dir / "release.json"
+        self.metrics_dir = self.artifacts_dir / "metrics"
+        # [model.<backend>] tables: hyperparameters per backend
+        self.model_params = {
+            name: params
+            for name, params in config["model"].items()
+            if isinstance(params, dict)
+        }
+
+        self.train_n_jobs = config["train"]["n_jobs"]
+        self.train_search = config["train"]["search"]
 
         self.drop_cols = config["columns"]["drop"]
         self.datetime_cols = config["columns"]["datetime"]
@@ -74,14 +157,14 @@ class Settings:
             "productDesc": "Human-readable description of the plan/coverage.",
             "coverage": "Coverage code (e.g., ADLD = Accidental Damage; ADLD/THEFT = Accidental Damage + Theft).",
             "productCode": "Internal product identifier/code.",
-            "policyStartDate": "Policy start date (epoch ms or dd/mm/yyyy).",
-            "policyEndDate": "Policy end date (epoch ms or dd/mm/yyyy).",
+            "policyStartDate": "Policy start date (epoch ms or mm/dd/yyyy; dd/mm/yyyy when the day is over 12).",
+            "policyEndDate": "Policy end date (epoch ms or mm/dd/yyyy; dd/mm/yyyy when the day is over 12).",
             "policyStatus": "Policy state (Active, Cancelled, Lapsed).",
             "retailerName": "Retail channel or merchant.",
             "deviceType": "Device category (SMARTPHONES, WEARABLES, etc.).",
             "make": "Device manufacturer.",
             "model": "Device model identifier.",
-            "purchaseDate": "Device purchase date (epoch ms or dd/mm/yyyy).",
+            "purchaseDate": "Device purchase date (epoch ms or mm/dd/yyyy; dd/mm/yyyy when the day is over 12).",
             "deviceCost": "Cash price paid for the device (if known).",
             "relationship": "Relationship of claimant to owner (e.g., self).",
             "channel": "Claim submission channel.",
@@ -102,3 +185,21 @@ class Settings:
             "issueDesc": "Long free-text narrative of the incident/issue.",
             "decision": "Final decision already made by your system (COMPLETED/DECLINED).",
         }
+
+        for name, value in vars(self).items():
+            super().__setattr__(name, _freeze(value))
+        self._frozen = True
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False):
+            raise AttributeError(f"settings are read-only; set {name!r} in config.toml")
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name):
+        raise AttributeError(f"settings are read-only; can't delete {name!r}")
+
+
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """The process-wide `Settings`, loaded on first use."""
+    return Settings()
@@ -1,123 +1,121 @@
-import os
-import pickle
-import sys
+from typing import List
 
 import pandas as pd
 import numpy as np
 
-sys.path.append(os.path.abspath(".."))
-from config.settings import Settings
+from config.settings import get_settings
+from inference.registry import Artifacts, registry
+from telemetry import MODEL_BATCH_ROWS, stage
 
-
-from pathlib import Path
-
-settings = Settings()
-
-
-ROOT = Path(__file__).resolve().parents[1]
-
-MODEL_PATH = ROOT / "artifacts" / "models" / "random_forest.pkl"
-BIN_ENC_PATH = ROOT / "artifacts" / "encoders" / "binary_encoders.pkl"
-OHE_PATH = ROOT / "artifacts" / "encoders" / "ohe_encoder.pkl"
+settings = get_settings()
 
 
 class Infer:
 
-    def __init__(self, data):
+    def __init__(self, data, artifacts: Artifacts = None):
         self.df = pd.DataFrame(data)
 
-        # Load the model
-        with open(MODEL_PATH, "rb") as f:
-            self.model = pickle.load(f)
-
-    def drop_columns(self):
-        self.df = self.df.drop(columns=settings.drop_cols)
-        return self.df
-
-    def fillna(self):
-
-        self.df[settings.binary_cols] = self.df[settings.binary_cols].fillna(
-            self.df[settings.binary_cols].mode().iloc[0]
-        )
-
-        # self.df[settings.category_cols] = self.df[settings.category_cols].fillna(
-        #     self.df[settings.category_cols].mode().iloc[0]
-        # )
-
-        # Fill categoricals: mode per column, then fallback to "MISSING", and force string dtype
-        cat = self.df[settings.category_cols].copy()
-
-        modes = cat.mode(dropna=True)  # one row with per-column modes (may be empty)
-        if not modes.empty:
-            cat = cat.fillna(modes.iloc[0])  # use mode where available
-
-        cat = cat.fillna("MISSING").astype(
-            "string"
-        )  # fallback + consistent dtype for OHE
-        self.df[settings.category_cols] = cat
-
-        # (optional) quiet the future warning about silent downcasting
-        self.df.infer_objects(copy=False)
-
-        self.df[settings.continous_cols] = self.df[settings.continous_cols].fillna(
-            self.df[settings.continous_cols].median()
-        )
-
-        return self.df
-
-    def encode_binary(self):
-
-        with open(BIN_ENC_PATH, "rb") as f:
-            encoders = pickle.load(f)
-
-        for col, le in encoders.items():
-            self.df[col] = le.transform(self.df[col])
-
-        return self.df
-
-    def one_hot_encoder(self):
-
-        with open(OHE_PATH, "rb") as f:
-            ohe = pickle.load(f)
-
-        print(self.df)
-
-        enc = ohe.transform(self.df[settings.category_cols])
-
-        enc_cols = ohe.get_feature_names_out(settings.category_cols)
-        enc_df = pd.DataFrame(enc, columns=enc_cols, index=self.df.index).astype(int)
-
-        self.df = pd.concat(
-            [self.df.drop(columns=settings.category_cols), enc_df], axis=1
-        )
-
-        return self.df
-
-    def process_datetime(self):
-
-        for col in settings.datetime_cols:
-
-            self.df[col] = pd.to_datetime(self.df[col], format="mixed")
-
-            self.df[f"{col}_year"] = self.df[col].dt.year
-            self.df[f"{col}_month"] = self.df[col].dt.month
-            self.df[f"{col}_day"] = self.df[col].dt.day
-            self.df = self.df.drop(columns=[col])
-
-        return self.df
+        # Shared, already-unpickled model and feature pipeline
+        self.artifacts = artifacts if artifacts is not None else registry.get()
+        self.model = self.artifacts.model
+        self.pipeline = self.artifacts.pipeline
 
     def preprocess(self):
-
-        self.df = self.drop_columns()
-        self.df = self.fillna()
-        self.df = self.encode_binary()
-        self.df = self.one_hot_encoder()
-        self.df = self.process_datetime()
-
-        return self.df
+        # Same fitted pipeline as training: drop -> fillna -> encode -> OHE -> datetime
+        return self.pipeline.transform(self.df, sparse=settings.sparse_onehot)
 
     def predict(self):
+        return self.predict_with_proba()[0].tolist()
 
+    def predict_with_proba(self):
+        """(labels, calibrated P(approved)) from a single pass over the model."""
         X = self.preprocess()
-        prediction = self.model.predict(X)
-        return prediction.astype(int).tolist()
+        return _labels_and_proba(self.artifacts, X)
+
+    def predict_proba(self):
+        return self.predict_with_proba()[1]
+
+    @staticmethod
+    def predict_record_proba(record: dict, artifacts: Artifacts = None):
+        """(label, calibrated P(approved)) for one claim.
+
+        Single-claim fast path: compiled lookups, no DataFrames.
+        """
+        artifacts = artifacts if artifacts is not None else registry.get()
+        X = artifacts.pipeline.transform_record(record)
+        labels, proba = _labels_and_proba(artifacts, X)
+        return int(labels[0]), float(proba[0])
+
+    @staticmethod
+    def predict_features_proba(X, artifacts: Artifacts = None):
+        """(labels, calibrated P(approved)) for rows the pipeline already transformed."""
+        artifacts = artifacts if artifacts is not None else registry.get()
+        return _labels_and_proba(artifacts, X)
+
+
+def score_rows(
+    records: List[dict], artifacts: Artifacts = None, proba: bool = False
+) -> List[dict]:
+    """Score claims one at a time, so a bad claim fails alone.
+
+    The fallback for a vectorized batch that raised: returns one dict per
+    record, in order, with `prediction` (and `probability` when `proba`), or
+    the `error` that claim raised.
+    """
+    artifacts = artifacts if artifacts is not None else registry.get()
+    results = []
+    for record in records:
+        try:
+            label, probability = Infer.predict_record_proba(record, artifacts)
+        except ValueError as exc:
+            results.append({"error": str(exc)})
+            continue
+        result = {"prediction": label}
+        if proba:
+            result["probability"] = probability
+        results.append(result)
+    return results
+
+
+def _labels_and_proba(artifacts: Artifacts, X):
+    # Every model backend scores through the same predict_proba interface
+    model = artifacts.model
+    # Past a few hundred rows per call sklearn's compiled traversal beats the
+    # flat walk (same probabilities either way)
+    if artifacts.bulk_model is not None and X.shape[0] >= settings.model_bulk_rows:
+        bulk = artifacts.bulk_model.get()
+        if bulk is not None:
+            model = bulk
+    MODEL_BATCH_ROWS.observe(X.shape[0])
+    with stage("model.predict"):
+        raw = artifacts.backend.predict_proba(model, X)
+    # Same as model.predict (argmax of the class probabilities), without a second pass
+    labels = model.classes_[raw.argmax(axis=1)].astype(int)
+    positive = raw[:, list(model.classes_).index(1)]
+    with stage("model.calibrate"):
+        return labels, artifacts.calibrator.predict(positive)
+
+
+def decision_lane(prediction: int, probability: float) -> str:
+    """Route a scored claim: confident approvals/declines skip explanation and review.
+
+    Both the label and the calibrated score have to agree before a claim is
+    fast-laned; everything else goes to "review".
+    """
+    if prediction == 1 and probability >= settings.auto_approve_threshold:
+        return "auto_approve"
+    if prediction == 0 and probability <= settings.auto_decline_threshold:
+        return "auto_decline"
+    return "review"
+
+
+def decision_lanes(labels: np.ndarray, probabilities: np.ndarray) -> list:
+    """`decision_lane` for a whole batch at once."""
+    return np.select(
+        [
+            (labels == 1) & (probabilities >= settings.auto_approve_threshold),
+            (labels == 0) & (probabilities <= settings.auto_decline_threshold),
+        ],
+        ["auto_approve", "auto_decline"],
+        default="review",
+    ).tolist()
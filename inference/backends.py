@@ -0,0 +1,150 @@
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from config.settings import get_settings
+from inference.flat import FlatForest
+
+settings = get_settings()
+
+# TOML has no null: 0 stands for "unlimited"
+_UNLIMITED = ("max_depth", "max_leaf_nodes")
+
+
+class ModelBackend:
+    """What `Train` and `Infer` need to know about one model family.
+
+    Training builds, fits and finalises the estimator through this object and
+    inference scores through `predict_proba`, so adding a model means adding
+    a backend here and nothing else. `encoding` is the `FeaturePipeline`
+    layout the model is fitted on.
+    """
+
+    name: str = ""
+    encoding: str = "onehot"
+    # Whether `flatten` can export the model for the "flat" engine
+    can_flatten: bool = False
+
+    @property
+    def max_categories(self) -> Optional[int]:
+        """Largest vocabulary per native categorical column (None = no limit)."""
+        return None
+
+    def params(self) -> Dict:
+        """Hyperparameters from `[model.<name>]` in config.toml (0 = None)."""
+        return {
+            key: (None if value == 0 and key in _UNLIMITED else value)
+            for key, value in settings.model_params.get(self.name, {}).items()
+        }
+
+    def build(self, categorical_features: Optional[np.ndarray] = None, **params):
+        raise NotImplementedError
+
+    def finalize(self, model):
+        """Adjust a fitted model for serving before it is saved."""
+        return model
+
+    def flatten(self, model):
+        """Array-only copy of a fitted model, scored without scikit-learn."""
+        raise NotImplementedError(f"{self.name} models can't be flattened")
+
+    def predict_proba(self, model, X) -> np.ndarray:
+        return model.predict_proba(_with_feature_names(model, X))
+
+    def n_nodes(self, model) -> int:
+        raise NotImplementedError
+
+
+def _with_feature_names(model, X):
+    """`X` under the column names `model` was fitted with, if it has any.
+
+    A model trained on `Preprocessor.preprocess`'s named-column frame warns
+    on every call with the pipeline's bare matrix. The names are the
+    pipeline's own, in the same order, so wrapping is all it takes; models
+    fitted on arrays (and flat exports) get `X` unchanged.
+    """
+    names = getattr(model, "feature_names_in_", None)
+    if names is None:
+        return X
+    if sp.issparse(X):
+        return pd.DataFrame.sparse.from_spmatrix(X, columns=names)
+    return pd.DataFrame(X, columns=names, copy=False)
+
+
+class RandomForestBackend(ModelBackend):
+    name = "random_forest"
+    encoding = "onehot"
+    can_flatten = True
+
+    def build(self, categorical_features=None, **params):
+        # sklearn.ensemble takes most of a second to import, and serving only
+        # needs it to unpickle a model saved for the "sklearn" engine
+        from sklearn.ensemble import RandomForestClassifier
+
+        # oob_score: out-of-bag probabilities come free with bagging and are
+        # what the calibrator is fitted on
+        return RandomForestClassifier(
+            random_state=settings.random_state,
+            oob_score=True,
+            n_jobs=settings.train_n_jobs,
+            **{**self.params(), **params},
+        )
+
+    def finalize(self, model):
+        # Requests are small; thread dispatch per predict costs more than it saves
+        return model.set_params(n_jobs=None)
+
+    def flatten(self, model):
+        return FlatForest.from_forest(model)
+
+    def n_nodes(self, model) -> int:
+        return sum(t.tree_.node_count for t in model.estimators_)
+
+
+class HistGradientBoostingBackend(ModelBackend):
+    name = "hist_gradient_boosting"
+    encoding = "native"
+
+    @property
+    def max_categories(self) -> Optional[int]:
+        # Category codes must fit in max_bins; one bin stays free for missing values
+        return self.params().get("max_bins", 255) - 1
+
+    def build(self, categorical_features=None, **params):
+        from sklearn.ensemble import HistGradientBoostingClassifier
+
+        # Categorical columns arrive as ordinal codes and missing values as NaN;
+        # both are split on natively, so no one-hot block and no fillna
+        if categorical_features is not None and not np.any(categorical_features):
+            categorical_features = None
+        return HistGradientBoostingClassifier(
+            categorical_features=categorical_features,
+            random_state=settings.random_state,
+            **{**self.params(), **params},
+        )
+
+    def n_nodes(self, model) -> int:
+        return sum(
+            len(predictor.nodes)
+            for iteration in model._predictors
+            for predictor in iteration
+        )
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (RandomForestBackend(), HistGradientBoostingBackend())
+}
+
+
+def get_backend(name: Optional[str] = None) -> ModelBackend:
+    """Backend by name; defaults to `[model] backend` in config.toml."""
+    name = name or settings.model_backend
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"unknown model backend {name!r}; expected one of {sorted(BACKENDS)}"
+        ) from None
@@ -0,0 +1,77 @@
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+from telemetry import COLD_START_SECONDS
+
+# uvicorn's logger, so startup timings show up in the server log without extra config
+logger = logging.getLogger("uvicorn.error")
+
+
+class ModelReadiness:
+    """Where the serving model is in its startup, for probes and request gating.
+
+    `start` runs the load-or-train routine in a background thread so the
+    server accepts connections right away; the routine reports its phase
+    ("loading", "training") through `set_phase`, and the thread marks the
+    model "ready" when it returns. If it raises, the model is "failed" (with
+    the error) and the routine is retried, backing off from `retry_seconds`
+    up to `max_retry_seconds`, until it succeeds. The clock starts when this
+    object is created, i.e. when the app module is imported.
+    """
+
+    def __init__(self, retry_seconds: float = 5.0, max_retry_seconds: float = 60.0):
+        self.retry_seconds = retry_seconds
+        self.max_retry_seconds = max_retry_seconds
+        self.started_at = time.monotonic()
+        self.phase = "starting"
+        self.error: Optional[str] = None
+        self.cold_start_seconds: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.phase == "ready"
+
+    def set_phase(self, phase: str):
+        self.phase = phase
+        logger.info(
+            "model %s (%.2fs since start)", phase, time.monotonic() - self.started_at
+        )
+
+    def start(self, prepare: Callable[["ModelReadiness"], None]):
+        def run():
+            delay = self.retry_seconds
+            while True:
+                try:
+                    prepare(self)
+                    break
+                except Exception as exc:
+                    self.error = f"{type(exc).__name__}: {exc}"
+                    self.phase = "failed"
+                    logger.exception("model startup failed; retrying in %.0fs", delay)
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_retry_seconds)
+            self.error = None
+            self.cold_start_seconds = time.monotonic() - self.started_at
+            COLD_START_SECONDS.set(self.cold_start_seconds)
+            self.phase = "ready"
+            logger.info(
+                "model ready: cold_start_to_ready_seconds=%.3f", self.cold_start_seconds
+            )
+
+        self._thread = threading.Thread(target=run, name="model-startup", daemon=True)
+        self._thread.start()
+
+    def info(self) -> dict:
+        return {
+            "ready": self.ready,
+            "phase": self.phase,
+            "error": self.error,
+            "elapsed_seconds": time.monotonic() - self.started_at,
+            "cold_start_seconds": self.cold_start_seconds,
+        }
+
+
+readiness = ModelReadiness()
@@ -0,0 +1,469 @@
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from config.settings import get_settings
+from inference.backends import ModelBackend, get_backend
+from inference.flat import FlatForest
+from preprocess.pipeline import FeaturePipeline
+from telemetry import artifact_load
+
+settings = get_settings()
+
+# uvicorn's logger, so failed reloads show up in the server log
+logger = logging.getLogger("uvicorn.error")
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Model formats a release can hold; [model] engine = "auto" serves both
+ENGINES = ("sklearn", "flat")
+
+# Same settings Train publishes through. A release directory holds one
+# training run: the pipeline, the calibrator and the model in every engine
+# the backend supports. release.json names the live one and is replaced last
+RELEASE_PATH = settings.release_path
+RELEASES_DIR = settings.releases_dir
+PIPELINE_FILE = "feature_pipeline.pkl"
+CALIBRATOR_FILE = "calibrator.pkl"
+# Written into a release directory once release.json has pointed at it; only
+# such directories are ever pruned, never one a training run is still writing
+PUBLISHED_MARKER = ".published"
+
+
+def model_file(backend: ModelBackend, engine: str) -> str:
+    """The model for `engine`, relative to a release directory. The flat
+    engine maps arrays named by `<backend>_flat/manifest.json`."""
+    if engine == "flat":
+        return f"{backend.name}_flat/manifest.json"
+    return f"{backend.name}.pkl"
+
+
+@dataclass(frozen=True)
+class Artifacts:
+    """An immutable, fully loaded set of model artifacts.
+
+    Requests hold on to one snapshot for their whole lifetime, so a reload
+    that lands mid-request never mixes a new model with old encoders.
+    """
+
+    model: Any
+    pipeline: FeaturePipeline
+    calibrator: Any
+    version: str
+    backend: ModelBackend = field(default_factory=get_backend)
+    # The pickled estimator for calls of `settings.model_bulk_rows` rows or
+    # more, when `model` is the flat export (engine = "auto")
+    bulk_model: Optional["LazyModel"] = None
+    release: str = ""
+    paths: Dict[str, Path] = field(default_factory=dict)
+    hashes: Dict[str, str] = field(default_factory=dict)
+    loaded_at: float = 0.0
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _stat(path: Path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+class LazyModel:
+    """A pickled model from a release, unpickled by the first call that needs it.
+
+    `get()` returns None, once logged, if the file can't be loaded any more
+    (e.g. the release was pruned), so callers fall back to the main model.
+    """
+
+    def __init__(self, path: Path, sha256: str):
+        self.path = Path(path)
+        self.sha256 = sha256
+        self._model = None
+        self._failed = False
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def get(self):
+        if self._model is None and not self._failed:
+            with self._lock:
+                if self._model is None and not self._failed:
+                    try:
+                        if _sha256(self.path) != self.sha256:
+                            raise ValueError(
+                                f"{self.path} changed since it was published"
+                            )
+                        with artifact_load("bulk_model"), open(self.path, "rb") as f:
+                            self._model = pickle.load(f)
+                    except (OSError, ValueError):
+                        self._failed = True
+                        logger.exception(
+                            "can't load %s; scoring with the main model", self.path
+                        )
+        return self._model
+
+
+def _write_json(path: Path, obj) -> None:
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(obj, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+_lock_guard = threading.RLock()
+_lock_depth: Dict[Path, int] = {}
+
+
+@contextmanager
+def release_lock(release_path: Path = RELEASE_PATH) -> Iterator[None]:
+    """Exclusive lock on publishing next to `release_path`, across processes.
+
+    An flock on `release.lock`: uvicorn workers and training runs sharing the
+    artifacts directory publish and prune one at a time. Re-entrant within a
+    process, so `publish_release` can run inside a caller's lock.
+    """
+    path = Path(release_path).with_suffix(".lock")
+    with _lock_guard:
+        depth = _lock_depth.get(path, 0)
+        _lock_depth[path] = depth + 1
+        try:
+            if depth:
+                yield
+                return
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+        finally:
+            _lock_depth[path] -= 1
+
+
+def new_release_dir(releases_dir: Path = RELEASES_DIR) -> Path:
+    """A fresh, not yet published directory for one training run."""
+    release = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    directory = Path(releases_dir) / release
+    directory.mkdir(parents=True)
+    return directory
+
+
+def publish_release(
+    directory: Path,
+    backend: ModelBackend,
+    release_path: Path = RELEASE_PATH,
+    keep: int = settings.registry_keep_releases,
+) -> Path:
+    """Point `release_path` at a complete release directory.
+
+    Records the sha256 of every artifact in it, replaces `release_path`
+    atomically, then deletes the previously published releases older than
+    this one, all but the newest `keep - 1`. Directories that were never
+    published (another run still writing) are left alone. Until the replace,
+    workers keep loading the previous release in full. Runs under
+    `release_lock`.
+    """
+    directory, release_path = Path(directory), Path(release_path)
+    with release_lock(release_path):
+        _publish(directory, backend, release_path)
+        _prune(directory, keep)
+    return release_path
+
+
+def _publish(directory: Path, backend: ModelBackend, release_path: Path) -> None:
+    files = {"pipeline": PIPELINE_FILE, "calibrator": CALIBRATOR_FILE}
+    for engine in ENGINES:
+        name = model_file(backend, engine)
+        if (directory / name).exists():
+            files[engine] = name
+    missing = [
+        name
+        for name in ("pipeline", "calibrator")
+        if not (directory / files[name]).exists()
+    ]
+    if missing or not set(files) & set(ENGINES):
+        raise FileNotFoundError(f"{directory} is not a complete release")
+
+    _write_json(
+        release_path,
+        {
+            "release": directory.name,
+            "directory": os.path.relpath(directory, release_path.parent),
+            "backend": backend.name,
+            "created_at": time.time(),
+            "files": files,
+            "sha256": {key: _sha256(directory / name) for key, name in files.items()},
+        },
+    )
+    (directory / PUBLISHED_MARKER).touch()
+
+
+def _prune(directory: Path, keep: int) -> None:
+    # Release ids start with their creation time, so names sort by age
+    older = sorted(
+        p
+        for p in directory.parent.iterdir()
+        if p.is_dir() and p.name < directory.name and (p / PUBLISHED_MARKER).exists()
+    )
+    for stale in older[: max(len(older) - (keep - 1), 0)]:
+        shutil.rmtree(stale, ignore_errors=True)
+
+
+class ArtifactRegistry:
+    """Process-wide cache of the model, calibrator and feature pipeline.
+
+    Artifacts are unpickled once and shared read-only across requests. Every
+    `reload_interval` seconds `get()` has a background thread stat
+    `release_path`; when it names another release, that release is loaded,
+    checked (hashes, backend, encoding, feature count) and swapped in with a
+    single reference assignment. `get()` itself never waits for a reload, so
+    it is safe to call on the event loop once the first load is done. A
+    release that fails to load is logged and skipped, and the previous
+    snapshot keeps serving.
+    """
+
+    def __init__(
+        self,
+        release_path: Path = RELEASE_PATH,
+        engine: str = settings.model_engine,
+        reload_interval: Optional[float] = 5.0,
+    ):
+        if engine not in ("auto", *ENGINES):
+            raise ValueError(
+                f"engine must be 'auto', 'flat' or 'sklearn', got {engine!r}"
+            )
+        self.release_path = Path(release_path)
+        self.engine = engine
+        self.reload_interval = reload_interval
+
+        self._snapshot: Optional[Artifacts] = None
+        self._stat: Optional[tuple] = None
+        self._failed_stat: Optional[tuple] = None
+        self._lock = threading.Lock()
+        self._reloading = threading.Lock()
+        self._reload_thread: Optional[threading.Thread] = None
+        self._last_check = 0.0
+        self.load_count = 0
+
+    @property
+    def version(self) -> Optional[str]:
+        snapshot = self._snapshot
+        return snapshot.version if snapshot is not None else None
+
+    def exists(self) -> bool:
+        return self.release_path.exists()
+
+    def load(self) -> Artifacts:
+        """Unconditionally (re)load the current release and swap it in."""
+        with self._lock:
+            return self._load()
+
+    def _read_release(self) -> dict:
+        with open(self.release_path) as f:
+            return json.load(f)
+
+    def _load(self) -> Artifacts:
+        stat = _stat(self.release_path)
+        release = self._read_release()
+
+        backend = get_backend()
+        if release["backend"] != backend.name:
+            raise ValueError(
+                f"{self.release_path} is a {release['backend']} release but [model] "
+                f"backend is {backend.name}; retrain to publish one"
+            )
+        # Backends without a flat export (hist_gradient_boosting) serve the pickle
+        engine = "sklearn" if self.engine == "sklearn" else "flat"
+        if engine not in release["files"]:
+            if self.engine == "flat":
+                logger.info(
+                    "release %s has no flat export (%s); serving the sklearn model",
+                    release["release"],
+                    backend.name,
+                )
+            engine = "sklearn"
+        if engine not in release["files"]:
+            raise ValueError(f"release {release['release']} has no model")
+
+        directory = self.release_path.parent / release["directory"]
+        paths = {
+            "model": directory / release["files"][engine],
+            "pipeline": directory / release["files"]["pipeline"],
+            "calibrator": directory / release["files"]["calibrator"],
+        }
+        hashes = {name: _sha256(path) for name, path in paths.items()}
+        expected = {
+            "model": release["sha256"][engine],
+            "pipeline": release["sha256"]["pipeline"],
+            "calibrator": release["sha256"]["calibrator"],
+        }
+        if hashes != expected:
+            changed = sorted(name for name in hashes if hashes[name] != expected[name])
+            raise ValueError(
+                f"release {release['release']}: {', '.join(changed)} changed since "
+                "it was published"
+            )
+
+        with artifact_load("model"):
+            if engine == "flat":
+                # Memory-mapped read-only: workers share the pages instead of copies
+                model = FlatForest.load(paths["model"], mmap_mode="r")
+            else:
+                with open(paths["model"], "rb") as f:
+                    model = pickle.load(f)
+        with artifact_load("pipeline"):
+            pipeline = FeaturePipeline.load(paths["pipeline"])
+        with artifact_load("calibrator"), open(paths["calibrator"], "rb") as f:
+            calibrator = pickle.load(f)
+
+        if pipeline.encoding != backend.encoding:
+            raise ValueError(
+                f"{paths['pipeline']} uses {pipeline.encoding!r} encoding but the "
+                f"{backend.name} backend expects {backend.encoding!r}; retrain to "
+                "regenerate it"
+            )
+        if pipeline.n_features_ != model.n_features_in_:
+            raise ValueError(
+                f"release {release['release']}: the pipeline writes "
+                f"{pipeline.n_features_} features but the model expects "
+                f"{model.n_features_in_}"
+            )
+
+        bulk_model = None
+        if self.engine == "auto" and engine == "flat" and "sklearn" in release["files"]:
+            bulk_model = LazyModel(
+                directory / release["files"]["sklearn"], release["sha256"]["sklearn"]
+            )
+
+        digest = hashlib.sha256(
+            "".join(hashes[name] for name in sorted(hashes)).encode()
+        ).hexdigest()
+
+        snapshot = Artifacts(
+            model=model,
+            pipeline=pipeline,
+            calibrator=calibrator,
+            version=digest[:12],
+            backend=backend,
+            bulk_model=bulk_model,
+            release=release["release"],
+            paths=paths,
+            hashes=hashes,
+            loaded_at=time.time(),
+        )
+
+        # Single reference assignment: readers see either the old or the new set
+        self._snapshot = snapshot
+        self._stat = stat
+        self._failed_stat = None
+        self._last_check = time.monotonic()
+        self.load_count += 1
+        return snapshot
+
+    def refresh(self) -> bool:
+        """Reload if release.json names another release. Returns True on reload."""
+        with self._lock:
+            self._last_check = time.monotonic()
+            if self._snapshot is None:
+                self._load()
+                return True
+
+            stat = _stat(self.release_path)
+            # Unchanged, or the same broken release that already failed
+            if stat in (self._stat, self._failed_stat):
+                return False
+            if self._read_release()["release"] == self._snapshot.release:
+                self._stat = stat
+                return False
+
+            try:
+                self._load()
+            except Exception:
+                self._failed_stat = stat
+                raise
+            return True
+
+    def get(self) -> Artifacts:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return self.load()
+
+        if (
+            self.reload_interval is not None
+            and time.monotonic() - self._last_check >= self.reload_interval
+        ):
+            self._refresh_in_background()
+        return snapshot
+
+    def _refresh_in_background(self) -> None:
+        # One reload at a time; callers meanwhile keep the current snapshot
+        if not self._reloading.acquire(blocking=False):
+            return
+
+        def run():
+            try:
+                self.refresh()
+            except Exception:
+                # Missing, half-written or inconsistent release: keep serving
+                # the old set; a newer release.json is tried again
+                logger.exception(
+                    "artifact reload failed; still serving release %s",
+                    self._snapshot.release,
+                )
+            finally:
+                self._reloading.release()
+
+        self._reload_thread = threading.Thread(
+            target=run, name="artifact-reload", daemon=True
+        )
+        self._reload_thread.start()
+
+    def info(self) -> dict:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {"loaded": False}
+        return {
+            "loaded": True,
+            "version": snapshot.version,
+            "release": snapshot.release,
+            "pipeline_version": snapshot.pipeline.version,
+            "backend": snapshot.backend.name,
+            "engine": self.engine,
+            "model": type(snapshot.model).__name__,
+            "bulk_model": (
+                None
+                if snapshot.bulk_model is None
+                else {
+                    "from_rows": settings.model_bulk_rows,
+                    "loaded": snapshot.bulk_model.loaded,
+                }
+            ),
+            "loaded_at": snapshot.loaded_at,
+            "load_count": self.load_count,
+            "artifacts": {
+                name: {"path": str(path), "sha256": snapshot.hashes[name]}
+                for name, path in snapshot.paths.items()
+            },
+        }
+
+
+registry = ArtifactRegistry(reload_interval=settings.registry_reload_interval)
@@ -0,0 +1,145 @@
+import csv
+import json
+from typing import AsyncIterator, Dict, List, Optional
+
+import anyio
+import pandas as pd
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import StreamingResponse
+
+from config.settings import get_settings
+from inference import Infer, score_rows
+from inference.registry import Artifacts
+from models import MLClaimDataRequest
+
+settings = get_settings()
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Re-split an arbitrary byte stream into decoded text lines."""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8").rstrip("\r")
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[dict]:
+    async for line in iter_lines(chunks):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            # Pass the raw line on; validation reports it as that row's error
+            yield line
+
+
+def _csv_value(col: str, value: str):
+    if value == "":
+        return None
+    # DateLike: bare digits are epoch milliseconds, anything else stays a string
+    if col in settings.datetime_cols and value.isdigit():
+        return int(value)
+    return value
+
+
+async def iter_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[dict]:
+    header = None
+    pending = ""
+    async for line in iter_lines(chunks):
+        # A quoted field (e.g. issueDesc) may span lines: wait for balanced quotes
+        pending = f"{pending}\n{line}" if pending else line
+        if pending.count('"') % 2:
+            continue
+        record, pending = pending, ""
+        if not record.strip():
+            continue
+
+        values = next(csv.reader([record]))
+        if header is None:
+            header = values
+            continue
+        yield {col: _csv_value(col, v) for col, v in zip(header, values)}
+
+
+def _score_chunk(records: List[dict], artifacts: Artifacts) -> List[int]:
+    df = pd.DataFrame(records).reindex(columns=settings.FIELD_ORDER)
+    return Infer(df, artifacts=artifacts).predict()
+
+
+async def score_stream(
+    records: AsyncIterator[dict],
+    artifacts: Artifacts,
+    chunk_size: int,
+) -> AsyncIterator[bytes]:
+    """Validate and score fixed-size micro-batches, yielding NDJSON as each finishes.
+
+    Only one chunk of input and its predictions are held in memory at a time.
+    """
+    row = 0
+    batch: List[dict] = []
+    rows: List[int] = []
+    errors: Dict[int, str] = {}
+
+    async def flush():
+        out = []
+        if batch:
+            try:
+                preds = await run_in_threadpool(_score_chunk, batch, artifacts)
+                results = [{"prediction": p} for p in preds]
+            except ValueError:
+                # Isolate the claim(s) that broke the vectorized chunk
+                results = await run_in_threadpool(score_rows, batch, artifacts)
+            for i, result in zip(rows, results):
+                out.append((i, result))
+        out.extend((i, {"error": msg}) for i, msg in errors.items())
+        out.sort(key=lambda item: item[0])
+        return "".join(
+            json.dumps({"row": i, **result}) + "\n" for i, result in out
+        ).encode()
+
+    async for record in records:
+        try:
+            batch.append(MLClaimDataRequest.model_validate(record).model_dump())
+            rows.append(row)
+        except ValidationError as exc:
+            err = exc.errors(include_url=False)[0]
+            loc = ".".join(str(part) for part in err["loc"])
+            errors[row] = f"{loc}: {err['msg']}" if loc else err["msg"]
+        row += 1
+
+        if len(batch) + len(errors) >= chunk_size:
+            yield await flush()
+            batch, rows, errors = [], [], {}
+
+    if batch or errors:
+        yield await flush()
+
+
+class UploadStreamingResponse(StreamingResponse):
+    """StreamingResponse whose body is produced while the request is still uploading.
+
+    Starlette normally listens on `receive` for a disconnect while streaming
+    (ASGI spec < 2.4, which uvicorn reports for HTTP); that listener would
+    swallow request-body messages the body iterator is reading. A client
+    disconnect still surfaces through `request.stream()`.
+    """
+
+    async def listen_for_disconnect(self, receive) -> None:
+        await anyio.sleep_forever()
+
+
+def stream_format(content_type: Optional[str], fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt.lower()
+    if content_type and "csv" in content_type:
+        return "csv"
+    return "ndjson"
+
+
+PARSERS = {"ndjson": iter_ndjson, "jsonl": iter_ndjson, "csv": iter_csv}
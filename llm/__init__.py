@@ -0,0 +1,224 @@
+import asyncio
+import os
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional
+
+from config.settings import get_settings
+from llm.cache import ExplanationCache
+from telemetry import LLM_REQUESTS, observe_stage, record_usage, stage
+
+if TYPE_CHECKING:
+    import httpx
+    from openai import AsyncOpenAI
+
+settings = get_settings()
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+class LLMUnavailable(RuntimeError):
+    """No API key configured, or the client hasn't been started."""
+
+
+class LLMError(RuntimeError):
+    """The provider failed the request (after the SDK's retries)."""
+
+
+class LLMTimeout(LLMError):
+    """The provider didn't answer within `timeout` (after retries)."""
+
+
+def _provider_error(exc: Exception) -> Optional[LLMError]:
+    # Only a client that got as far as calling the SDK raises its errors, so
+    # openai is already imported here
+    import openai
+
+    if isinstance(exc, openai.APITimeoutError):
+        return LLMTimeout(str(exc))
+    if isinstance(exc, openai.APIError):
+        return LLMError(str(exc))
+    return None
+
+
+class LLMClient:
+    """One pooled `AsyncOpenAI` client for the whole process.
+
+    Started and closed by the app lifespan. Connections are kept alive and
+    reused across requests, at most `max_concurrency` completions are in
+    flight at once (the rest wait on the semaphore instead of opening more
+    sockets), and the SDK retries timeouts / 429 / 5xx with exponential
+    backoff up to `max_retries` times. SDK failures surface as `LLMError` /
+    `LLMTimeout`.
+
+    The SDK (a third of a second to import) is only loaded by the first
+    completion, off the event loop, so workers that never explain a claim
+    don't pay for it.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        max_concurrency: int,
+        timeout: float,
+        max_retries: int,
+        base_url: Optional[str] = None,
+    ):
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.base_url = base_url
+        # httpx transport override, e.g. httpx.ASGITransport(app=mock_openai.app)
+        # to keep the whole request path in one process (benchmarks/load_test.py)
+        self.transport: Optional["httpx.AsyncBaseTransport"] = None
+
+        self._api_key: Optional[str] = None
+        self._client: Optional["AsyncOpenAI"] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+
+    @property
+    def started(self) -> bool:
+        return self._semaphore is not None
+
+    def start(self) -> None:
+        # OPENAI_BASE_URL in the environment works too (e.g. the mock server)
+        self._api_key = os.getenv("OPENAI_API_KEY")
+        if not self._api_key:
+            return
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._connect_lock = asyncio.Lock()
+
+    def _connect(self) -> "AsyncOpenAI":
+        import httpx
+        from openai import AsyncOpenAI
+
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            ),
+            timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 5.0)),
+            transport=self.transport,
+        )
+        return AsyncOpenAI(
+            api_key=self._api_key,
+            base_url=self.base_url or None,
+            timeout=self.timeout,
+            max_retries=self.max_retries,
+            http_client=http_client,
+        )
+
+    async def _get_client(self) -> "AsyncOpenAI":
+        if not self.started:
+            raise LLMUnavailable("OPENAI_API_KEY is not set")
+        if self._client is None:
+            async with self._connect_lock:
+                if self._client is None:
+                    self._client = await asyncio.to_thread(self._connect)
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+        self._client = None
+        self._semaphore = None
+        self._connect_lock = None
+
+    async def complete(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        client = await self._get_client()
+
+        async with self._semaphore:
+            try:
+                with stage("llm.complete"):
+                    resp = await client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        temperature=settings.llm_temperature,
+                        max_tokens=settings.llm_max_tokens,
+                        **kwargs,
+                    )
+            except Exception as exc:
+                LLM_REQUESTS.labels("complete", "error").inc()
+                error = _provider_error(exc)
+                if error is None:
+                    raise
+                raise error from exc
+        LLM_REQUESTS.labels("complete", "ok").inc()
+        record_usage(resp.usage)
+        return resp.choices[0].message.content
+
+    async def stream(
+        self, messages: List[Dict[str, str]], **kwargs
+    ) -> AsyncIterator[str]:
+        """Yield completion text deltas as they arrive.
+
+        Closing the generator early (client went away) closes the upstream
+        response, so the provider stops generating and the connection and
+        semaphore slot are released straight away. Time to the first text
+        delta goes to the `llm.ttft` stage, the whole stream to `llm.stream`.
+        """
+        client = await self._get_client()
+
+        outcome = "error"
+        async with self._semaphore:
+            start = time.perf_counter()
+            first = True
+            try:
+                with stage("llm.stream"):
+                    chunks = await client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        temperature=settings.llm_temperature,
+                        max_tokens=settings.llm_max_tokens,
+                        stream=True,
+                        # Token usage arrives in one extra, choice-less final chunk
+                        stream_options={"include_usage": True},
+                        **kwargs,
+                    )
+                    async with chunks:
+                        async for chunk in chunks:
+                            record_usage(chunk.usage)
+                            if chunk.choices and chunk.choices[0].delta.content:
+                                if first:
+                                    observe_stage(
+                                        "llm.ttft", time.perf_counter() - start
+                                    )
+                                    first = False
+                                yield chunk.choices[0].delta.content
+                outcome = "ok"
+            except (GeneratorExit, asyncio.CancelledError):
+                # Closed early because the client went away: not a provider failure
+                outcome = "abandoned"
+                raise
+            except Exception as exc:
+                error = _provider_error(exc)
+                if error is None:
+                    raise
+                raise error from exc
+            finally:
+                LLM_REQUESTS.labels("stream", outcome).inc()
+
+
+llm_client = LLMClient(
+    model=settings.llm_model,
+    max_concurrency=settings.llm_max_concurrency,
+    timeout=settings.llm_timeout,
+    max_retries=settings.llm_max_retries,
+    base_url=settings.llm_base_url,
+)
+
+explanation_cache = (
+    ExplanationCache(
+        max_entries=settings.llm_cache_max_entries,
+        ttl=settings.llm_cache_ttl,
+        sqlite_path=(
+            ROOT / settings.llm_cache_sqlite_path
+            if settings.llm_cache_sqlite_path
+            else None
+        ),
+    )
+    if settings.llm_cache_enabled
+    else None
+)
@@ -0,0 +1,176 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from telemetry import EXPLANATION_CACHE
+
+_HITS_MEMORY = EXPLANATION_CACHE.labels("memory")
+_HITS_DISK = EXPLANATION_CACHE.labels("disk")
+_HITS_COALESCED = EXPLANATION_CACHE.labels("coalesced")
+_MISSES = EXPLANATION_CACHE.labels("miss")
+
+
+def cache_key(
+    messages: List[Dict[str, str]], model: str, temperature: float, max_tokens: int
+) -> str:
+    """Content address of an explanation: the exact request the model would get.
+
+    Keyed on the rendered messages rather than the claim, so any change to the
+    prompt (instructions, fields, truncation budget, glossary) or to the
+    sampling settings yields new keys without anything to bump by hand.
+    """
+    canonical = json.dumps(
+        {
+            "messages": messages,
+            "model": model,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ExplanationCache:
+    """Two-tier cache of LLM explanations.
+
+    An in-process LRU (bounded by `max_entries`, entries expire after `ttl`
+    seconds) in front of an optional SQLite file that survives restarts.
+    The LRU is only touched from the event loop; SQLite reads and writes run
+    in a worker thread so a slow disk never stalls other requests. Concurrent
+    misses on the same key share one LLM call instead of each paying for
+    their own. Lookups are counted in `claims_explanation_cache_total`.
+    """
+
+    def __init__(
+        self, max_entries: int, ttl: float, sqlite_path: Optional[Path] = None
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.sqlite_path = Path(sqlite_path) if sqlite_path else None
+
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Guards the SQLite connection, which worker threads share
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+    # ------------------------------------------------------------- sqlite
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.sqlite_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.sqlite_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS explanations "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            with self._db:
+                self._db.execute(
+                    "DELETE FROM explanations WHERE expires_at <= ?", (time.time(),)
+                )
+        return self._db
+
+    def _load(self, key: str) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            return (
+                self._connect()
+                .execute(
+                    "SELECT value, expires_at FROM explanations WHERE key = ?", (key,)
+                )
+                .fetchone()
+            )
+
+    def _store(self, key: str, value: str, expires_at: float) -> None:
+        with self._lock:
+            db = self._connect()
+            with db:
+                db.execute(
+                    "INSERT OR REPLACE INTO explanations VALUES (?, ?, ?)",
+                    (key, value, expires_at),
+                )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    # ------------------------------------------------------------ get/put
+
+    async def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                _HITS_MEMORY.inc()
+                return value
+            del self._memory[key]
+
+        if self.sqlite_path is not None:
+            row = await asyncio.to_thread(self._load, key)
+            if row is not None and row[1] > now:
+                self._remember(key, row[0], row[1])
+                _HITS_DISK.inc()
+                return row[0]
+
+        _MISSES.inc()
+        return None
+
+    async def put(self, key: str, value: str) -> None:
+        expires_at = time.time() + self.ttl
+        self._remember(key, value, expires_at)
+        if self.sqlite_path is not None:
+            await asyncio.to_thread(self._store, key, value, expires_at)
+
+    def _remember(self, key: str, value: str, expires_at: float) -> None:
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def get_or_create(
+        self, key: str, create: Callable[[], Awaitable[str]]
+    ) -> Tuple[str, bool]:
+        """(value, cached). Only successful results are stored."""
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            _HITS_COALESCED.inc()
+            return await asyncio.shield(inflight), True
+
+        future = asyncio.get_running_loop().create_future()
+        # Registered before the first await, so a concurrent miss on the same
+        # key (even one arriving during the SQLite read) waits for this one
+        self._inflight[key] = future
+        try:
+            value = await self.get(key)
+            cached = value is not None
+            if not cached:
+                value = await create()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Waiters re-raise it; don't warn about an unretrieved exception
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            if not cached:
+                await self.put(key, value)
+            return value, cached
+        finally:
+            del self._inflight[key]
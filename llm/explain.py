@@ -0,0 +1,87 @@
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import get_settings
+from llm import LLMError, LLMTimeout, LLMUnavailable, explanation_cache, llm_client
+from llm.cache import cache_key
+from llm.prompts import build_chatgpt_prompts
+
+settings = get_settings()
+
+
+# Model output (0/1) -> the decision label /explian expects
+DECISIONS = {value: key.upper() for key, value in settings.target_mapping.items()}
+
+
+def explanation_request(record: Dict) -> Tuple[List[Dict[str, str]], Optional[str]]:
+    """Chat messages for a record (which must include `decision`) and its cache key."""
+    system_prompt, user_prompt = build_chatgpt_prompts(record=record)
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+    key = None
+    if explanation_cache is not None:
+        key = cache_key(
+            messages,
+            llm_client.model,
+            settings.llm_temperature,
+            settings.llm_max_tokens,
+        )
+    return messages, key
+
+
+async def explain_record(record: Dict) -> Tuple[str, bool]:
+    """(explanation, cached) through the explanation cache when it's enabled."""
+    messages, key = explanation_request(record)
+    if key is None:
+        return await llm_client.complete(messages), False
+    return await explanation_cache.get_or_create(
+        key, lambda: llm_client.complete(messages)
+    )
+
+
+def _error(exc: BaseException) -> str:
+    if isinstance(exc, LLMTimeout):
+        return "LLM request timed out"
+    if isinstance(exc, (LLMUnavailable, LLMError)):
+        return str(exc)
+    return f"{type(exc).__name__}: {exc}"
+
+
+async def explain_many(
+    records: List[Dict], timeout: float, concurrency: int
+) -> List[Dict]:
+    """Explain every record concurrently (at most `concurrency` at a time).
+
+    Whatever hasn't finished after `timeout` seconds is cancelled and
+    reported as an error, so one slow completion can't hold the rest back.
+    Returns one dict per record, in order: `explanation` + `cached`, or `error`.
+    """
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one(record):
+        async with limit:
+            return await explain_record(record)
+
+    tasks = [asyncio.create_task(one(record)) for record in records]
+    if not tasks:
+        return []
+    try:
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+    finally:
+        # Also reached if the request itself is cancelled (client went away)
+        for task in tasks:
+            task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+    results = []
+    for task in tasks:
+        if task in pending:
+            results.append({"explanation": None, "error": "explanation timed out"})
+        elif task.exception() is not None:
+            results.append({"explanation": None, "error": _error(task.exception())})
+        else:
+            content, cached = task.result()
+            results.append({"explanation": content, "cached": cached})
+    return results
@@ -0,0 +1,116 @@
+import math
+import re
+from typing import Dict, List, Tuple
+
+from config.settings import get_settings
+from preprocess.dates import date_parts
+
+settings = get_settings()
+
+
+_INSTRUCTIONS = (
+    "You are an impartial insurance claims reviewer. The system has already decided "
+    "to COMPLETED or DECLINED each claim. Your job is to explain that decision clearly, "
+    "concisely, and defensibly using only the provided fields. Do not re-decide the outcome, "
+    "and do not invent facts. If information is missing, say so."
+)
+
+_WHITESPACE = re.compile(r"\s+")
+# Dates are always sent as YYYY-MM-DD, so the glossary needn't mention input formats
+_DATE_FORMATS = re.compile(r" \(epoch ms or [^)]*\)")
+
+
+def approx_tokens(text: str) -> int:
+    # ~4 characters per token for the BPE tokenizers the GPT-4o family uses
+    return math.ceil(len(text) / 4)
+
+
+def prompt_fields() -> List[str]:
+    """What the model scored on, plus the free-text fields and the decision."""
+    fields = [c for c in settings.FIELD_ORDER if c not in settings.drop_cols]
+    fields += [c for c in settings.llm_prompt_text_fields if c not in fields]
+    return fields + ["decision"]
+
+
+def _build_system_prompt(fields: List[str]) -> str:
+    lines, triage = [], []
+    for field in fields:
+        meaning = settings.COLUMN_GLOSSARY.get(field)
+        if meaning is None:
+            continue
+        if meaning.startswith("Triage:"):
+            # One line for all the 1/0 device checks instead of one each
+            triage.append(field)
+            continue
+        lines.append(f"- {field}: {_DATE_FORMATS.sub('', meaning)}")
+    if triage:
+        lines.append(
+            f"- {', '.join(triage)}: triage checks of the device, 1=working/yes, 0=no."
+        )
+    glossary = "\n".join(lines)
+
+    return (
+        f"{_INSTRUCTIONS}\n\n"
+        f"Column meanings:\n{glossary}\n\n"
+        "The claim is given as one `field: value` line per known field; fields "
+        "that are missing are left out. Dates are YYYY-MM-DD. Free text may be "
+        "truncated (marked with …)."
+    )
+
+
+# Identical for every request, so it forms a stable cacheable prefix
+PROMPT_FIELDS = prompt_fields()
+SYSTEM_PROMPT = _build_system_prompt(PROMPT_FIELDS)
+
+
+def truncate(text: str, budget: int) -> str:
+    text = _WHITESPACE.sub(" ", text).strip()
+    if approx_tokens(text) <= budget:
+        return text
+    cut = text[: budget * 4]
+    # Don't end mid-word when there's a word boundary reasonably close
+    space = cut.rfind(" ")
+    if space > len(cut) // 2:
+        cut = cut[:space]
+    return cut.rstrip() + "…"
+
+
+def _format(field: str, value):
+    if field in settings.datetime_cols:
+        try:
+            year, month, day = date_parts(value)
+        except (ValueError, OverflowError):
+            return str(value)
+        if math.isnan(year):
+            return None
+        return f"{int(year):04d}-{int(month):02d}-{int(day):02d}"
+
+    if isinstance(value, float):
+        if math.isnan(value):
+            return None
+        return str(int(value)) if value.is_integer() else str(value)
+
+    if field in settings.llm_prompt_text_fields:
+        return truncate(str(value), settings.llm_prompt_text_token_budget) or None
+
+    return str(value)
+
+
+def serialize_claim(record: Dict) -> str:
+    lines = []
+    for field in PROMPT_FIELDS:
+        value = record.get(field)
+        if value is None:
+            continue
+        text = _format(field, value)
+        if text:
+            lines.append(f"{field}: {text}")
+    return "\n".join(lines)
+
+
+def build_chatgpt_prompts(record: Dict) -> Tuple[str, str]:
+    user_prompt = (
+        "Explain the decision on this claim using only these fields.\n\n"
+        f"{serialize_claim(record)}"
+    )
+    return SYSTEM_PROMPT, user_prompt
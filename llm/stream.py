@@ -0,0 +1,111 @@
+import json
+import logging
+import time
+from typing import AsyncIterator, Dict, List, Optional
+
+import anyio
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
+
+from llm import LLMError, explanation_cache, llm_client
+
+# uvicorn's logger, so timings show up in the server log without extra config
+logger = logging.getLogger("uvicorn.error")
+
+
+def sse(data: dict, event: Optional[str] = None) -> bytes:
+    head = f"event: {event}\n" if event else ""
+    return f"{head}data: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+async def _replay(content: str, started: float) -> AsyncIterator[bytes]:
+    yield sse({"delta": content})
+    elapsed_ms = (time.perf_counter() - started) * 1e3
+    yield sse({"cached": True, "ttft_ms": elapsed_ms, "total_ms": elapsed_ms}, "done")
+
+
+async def _relay(
+    request: Request,
+    first: str,
+    chunks: AsyncIterator[str],
+    key: Optional[str],
+    started: float,
+    ttft: float,
+) -> AsyncIterator[bytes]:
+    parts = [first]
+    completed = False
+    try:
+        if first:
+            yield sse({"delta": first})
+        async for delta in chunks:
+            if await request.is_disconnected():
+                break
+            parts.append(delta)
+            yield sse({"delta": delta})
+        else:
+            completed = True
+    except LLMError as exc:
+        # Headers are already sent; report the failure in-band
+        yield sse({"detail": f"LLM request failed: {exc}"}, "error")
+    finally:
+        # Stops upstream generation if we're leaving early (disconnect / error).
+        # Shielded: on disconnect this task is already cancelled
+        with anyio.CancelScope(shield=True):
+            await chunks.aclose()
+        if not completed:
+            logger.info(
+                "explian stream abandoned after %.0f ms (ttft %.0f ms)",
+                (time.perf_counter() - started) * 1e3,
+                ttft * 1e3,
+            )
+
+    if not completed:
+        return
+
+    total = time.perf_counter() - started
+    content = "".join(parts)
+    # An empty completion would otherwise be replayed as a HIT from now on
+    if content and key is not None and explanation_cache is not None:
+        await explanation_cache.put(key, content)
+    logger.info("explian stream ttft %.0f ms, total %.0f ms", ttft * 1e3, total * 1e3)
+    yield sse({"cached": False, "ttft_ms": ttft * 1e3, "total_ms": total * 1e3}, "done")
+
+
+async def stream_explanation(
+    request: Request, messages: List[Dict[str, str]], key: Optional[str]
+) -> StreamingResponse:
+    """Server-Sent Events response for `/explian?stream=true`.
+
+    Waits for the first token before answering, so a missing key, timeout or
+    upstream error still becomes a normal HTTP error status. After that each
+    delta is sent as `data: {"delta": ...}` and the stream ends with an
+    `event: done` carrying time-to-first-token.
+    """
+    started = time.perf_counter()
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+    cached = None
+    if key is not None and explanation_cache is not None:
+        cached = await explanation_cache.get(key)
+    if cached is not None:
+        return StreamingResponse(
+            _replay(cached, started),
+            media_type="text/event-stream",
+            headers={**headers, "X-Cache": "HIT"},
+        )
+
+    chunks = llm_client.stream(messages)
+    try:
+        first = await anext(chunks)
+    except StopAsyncIteration:
+        first = ""
+    except BaseException:
+        await chunks.aclose()
+        raise
+    ttft = time.perf_counter() - started
+
+    return StreamingResponse(
+        _relay(request, first, chunks, key, started, ttft),
+        media_type="text/event-stream",
+        headers={**headers, "X-Cache": "MISS"},
+    )
@@ -1,7 +1,10 @@
 from typing import Optional, Union
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
+from telemetry import stage
 
+# Epoch milliseconds, or a string: `a/b/yyyy` is month-first (mm/dd/yyyy) unless
+# `a` is over 12, then day-first, so "05/03/2021" is 3 May; ISO dates also work
 DateLike = Optional[Union[int, str]]
 
 SAMPLE_DEFAULT = {
@@ -42,7 +45,17 @@ SAMPLE_DEFAULT = {
 }
 
 
-class MLClaimDataRequest(BaseModel):
+class TimedModel(BaseModel):
+    """Reports how long validating each request body takes (stage "validate")."""
+
+    @model_validator(mode="wrap")
+    @classmethod
+    def _timed(cls, data, handler):
+        with stage("validate"):
+            return handler(data)
+
+
+class MLClaimDataRequest(TimedModel):
     # order preserved as you wanted
     excessFee: Optional[float] = Field(SAMPLE_DEFAULT["excessFee"])
     rrp: Optional[float] = Field(SAMPLE_DEFAULT["rrp"])
@@ -90,52 +103,13 @@ class MLClaimDataRequest(BaseModel):
     model_config = {"json_schema_extra": {"example": SAMPLE_DEFAULT}}
 
 
-SAMPLE_DEFAULT["decision"] = "COMPLETED"
-
-
-class LLMClaimDataRequest(BaseModel):
-    excessFee: Optional[float] = Field(SAMPLE_DEFAULT["excessFee"])
-    rrp: Optional[float] = Field(SAMPLE_DEFAULT["rrp"])
-    balanceRRP: Optional[float] = Field(SAMPLE_DEFAULT["balanceRRP"])
-    oldBalanceRRP: Optional[float] = Field(SAMPLE_DEFAULT["oldBalanceRRP"])
-
-    productName: Optional[str] = Field(SAMPLE_DEFAULT["productName"])
-    productDesc: Optional[str] = Field(SAMPLE_DEFAULT["productDesc"])
-    coverage: Optional[str] = Field(SAMPLE_DEFAULT["coverage"])
-    productCode: Optional[str] = Field(SAMPLE_DEFAULT["productCode"])
-
-    policyStartDate: DateLike = Field(SAMPLE_DEFAULT["policyStartDate"])
-    policyEndDate: DateLike = Field(SAMPLE_DEFAULT["policyEndDate"])
-
-    policyStatus: Optional[str] = Field(SAMPLE_DEFAULT["policyStatus"])
-    retailerName: Optional[str] = Field(SAMPLE_DEFAULT["retailerName"])
-    deviceType: Optional[str] = Field(SAMPLE_DEFAULT["deviceType"])
-    make: Optional[str] = Field(SAMPLE_DEFAULT["make"])
-    model: Optional[str] = Field(SAMPLE_DEFAULT["model"])
-
-    purchaseDate: DateLike = Field(SAMPLE_DEFAULT["purchaseDate"])
-    deviceCost: Optional[int] = Field(SAMPLE_DEFAULT["deviceCost"])
+SAMPLE_EXPLAIN = {**SAMPLE_DEFAULT, "decision": "COMPLETED"}
 
-    relationship: Optional[str] = Field(SAMPLE_DEFAULT["relationship"])
-    channel: Optional[str] = Field(SAMPLE_DEFAULT["channel"])
-    claimType: Optional[str] = Field(SAMPLE_DEFAULT["claimType"])
-    country: Optional[str] = Field(SAMPLE_DEFAULT["country"])
 
-    turnOnOff: Optional[float] = Field(SAMPLE_DEFAULT["turnOnOff"])
-    touchScreen: Optional[float] = Field(SAMPLE_DEFAULT["touchScreen"])
-    smashed: Optional[float] = Field(SAMPLE_DEFAULT["smashed"])
-    frontCamera: Optional[float] = Field(SAMPLE_DEFAULT["frontCamera"])
-    backCamera: Optional[float] = Field(SAMPLE_DEFAULT["backCamera"])
-    frontOrBackCamera: Optional[float] = Field(SAMPLE_DEFAULT["frontOrBackCamera"])
-    audio: Optional[float] = Field(SAMPLE_DEFAULT["audio"])
-    mic: Optional[float] = Field(SAMPLE_DEFAULT["mic"])
-    buttons: Optional[float] = Field(SAMPLE_DEFAULT["buttons"])
-    connection: Optional[float] = Field(SAMPLE_DEFAULT["connection"])
-    charging: Optional[float] = Field(SAMPLE_DEFAULT["charging"])
+class LLMClaimDataRequest(MLClaimDataRequest):
+    """A claim plus the decision to explain."""
 
-    other: Optional[str] = Field(SAMPLE_DEFAULT["other"])
-    issueDesc: Optional[str] = Field(SAMPLE_DEFAULT["issueDesc"])
-    decision: Optional[str] = Field(SAMPLE_DEFAULT["decision"])
+    decision: Optional[str] = Field(SAMPLE_EXPLAIN["decision"])
 
-    # FastAPI/Schema docs will show SAMPLE_DEFAULT as example
-    model_config = {"json_schema_extra": {"example": SAMPLE_DEFAULT}}
+    # FastAPI/Schema docs will show SAMPLE_EXPLAIN as example
+    model_config = {"json_schema_extra": {"example": SAMPLE_EXPLAIN}}
@@ -0,0 +1,140 @@
+"""Wire formats for large batches: one-pass validation in, orjson out.
+
+`List[MLClaimDataRequest]` builds a model instance per claim and then a dict
+per claim again (`model_dump`). Here the raw body is validated by a single
+`TypeAdapter.validate_json` call, in pydantic-core and against the same
+field types, into plain Python data:
+
+- rows: `[{field: value, ...}, ...]`, the format `/batch-predict` always took
+- columns: `{field: [value, ...], ...}`, one array per field, which goes
+  straight into DataFrame columns without a per-claim dict at all
+
+Missing fields take the same `SAMPLE_DEFAULT` values as in `MLClaimDataRequest`.
+"""
+
+from typing import List
+
+import orjson
+import pandas as pd
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter, ValidationError
+
+# pydantic needs typing_extensions' TypedDict before Python 3.12
+from typing_extensions import TypedDict
+
+from config.settings import get_settings
+from models import SAMPLE_DEFAULT, MLClaimDataRequest
+from telemetry import stage
+
+settings = get_settings()
+
+FIELDS = {name: f.annotation for name, f in MLClaimDataRequest.model_fields.items()}
+DEFAULTS = {name: f.default for name, f in MLClaimDataRequest.model_fields.items()}
+
+# Same fields and types as MLClaimDataRequest, without the per-claim model instance
+ClaimRow = TypedDict("ClaimRow", FIELDS, total=False)
+ClaimColumns = TypedDict(
+    "ClaimColumns", {name: List[tp] for name, tp in FIELDS.items()}, total=False
+)
+
+ROWS = TypeAdapter(List[ClaimRow])
+COLUMNS = TypeAdapter(ClaimColumns)
+
+SAMPLE_COLUMNS = {name: [value, value] for name, value in SAMPLE_DEFAULT.items()}
+
+
+def openapi_body() -> dict:
+    """`openapi_extra` documenting both formats (the route reads the raw body)."""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "oneOf": [
+                            {
+                                "title": "Rows",
+                                "type": "array",
+                                "items": TypeAdapter(ClaimRow).json_schema(),
+                            },
+                            {"title": "Columns", **COLUMNS.json_schema()},
+                        ]
+                    },
+                    "examples": {
+                        "rows": {"value": [SAMPLE_DEFAULT]},
+                        "columns": {"value": SAMPLE_COLUMNS},
+                    },
+                }
+            },
+        }
+    }
+
+
+def _request_error(exc: ValidationError) -> RequestValidationError:
+    # Same 422 body FastAPI produces for a declared body parameter
+    return RequestValidationError(
+        [{**err, "loc": ("body", *err["loc"])} for err in exc.errors(include_url=False)]
+    )
+
+
+def _body_error(msg: str) -> RequestValidationError:
+    return RequestValidationError(
+        [{"type": "value_error", "loc": ("body",), "msg": msg, "input": None}]
+    )
+
+
+def _single_claim(body: bytes) -> bool:
+    # An object without a single array value is one claim sent without the
+    # surrounding list. Only checked once validation has already failed.
+    try:
+        data = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        return False
+    return (
+        isinstance(data, dict)
+        and bool(data)
+        and not any(isinstance(value, list) for value in data.values())
+    )
+
+
+def claims_frame(body: bytes) -> pd.DataFrame:
+    """Validate a rows or columns body into a DataFrame in `settings.FIELD_ORDER`.
+
+    Raises `RequestValidationError` (422) for anything `MLClaimDataRequest`
+    would reject, for columns of different lengths and for a single claim
+    object sent without a list. `[]` and `{}` give an empty frame.
+    """
+    columnar = body.lstrip()[:1] == b"{"
+    try:
+        with stage("validate"):
+            data = COLUMNS.validate_json(body) if columnar else ROWS.validate_json(body)
+    except ValidationError as exc:
+        if columnar and _single_claim(body):
+            raise _body_error(
+                "expected a list of claims or one array per field, got a single "
+                "claim object; wrap it in a list or use POST /predict"
+            ) from None
+        raise _request_error(exc) from None
+
+    if not columnar:
+        return pd.DataFrame(
+            [DEFAULTS | row for row in data], columns=settings.FIELD_ORDER
+        )
+
+    lengths = {name: len(values) for name, values in data.items()}
+    if len(set(lengths.values())) > 1:
+        raise _body_error(f"columns must all have the same length, got {lengths}")
+    n = next(iter(lengths.values()), 0)
+    return pd.DataFrame(
+        {name: data.get(name, [DEFAULTS[name]] * n) for name in settings.FIELD_ORDER},
+        columns=settings.FIELD_ORDER,
+    )
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON rendered by orjson; NumPy arrays and scalars are written directly,
+    without `.tolist()` or FastAPI's `jsonable_encoder` walking every element."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
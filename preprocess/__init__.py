@@ -1,122 +1,46 @@
-import os
-from pathlib import Path
-import sys
 import pandas as pd
-from sklearn.preprocessing import LabelEncoder
-from sklearn.preprocessing import OneHotEncoder
-import pickle
 
-sys.path.append(os.path.abspath(".."))
-from config.settings import Settings
+from config.settings import get_settings
+from inference.backends import get_backend
+from preprocess.ingest import load_dataset, model_columns
+from preprocess.pipeline import FeaturePipeline
 
-
-settings = Settings()
-
-
-PROJECT_ROOT = Path(__file__).resolve().parents[1]   # → Assessment/
-ENCODERS_DIR = PROJECT_ROOT / "artifacts" / "encoders"
-ENCODERS_DIR.mkdir(parents=True, exist_ok=True)
+settings = get_settings()
 
 
 class Preprocessor:
     def __init__(self, df: pd.DataFrame):
         self.df = df
-
-    def drop_columns(self):
-        self.df = self.df.drop(columns=settings.drop_cols)
-        return self.df
-
-    def fillna(self):
-
-        self.df[settings.binary_cols] = self.df[settings.binary_cols].fillna(
-            self.df[settings.binary_cols].mode().iloc[0]
-        )
-
-
-        # self.df[settings.category_cols] = self.df[settings.category_cols].fillna(
-        #     self.df[settings.category_cols].mode().iloc[0]
-        # )
-
-        # Fill categoricals: mode per column, then fallback to "MISSING", and force string dtype
-        cat = self.df[settings.category_cols].copy()
-
-        modes = cat.mode(dropna=True)          # one row with per-column modes (may be empty)
-        if not modes.empty:
-            cat = cat.fillna(modes.iloc[0])    # use mode where available
-
-        cat = cat.fillna("MISSING").astype("string")  # fallback + consistent dtype for OHE
-        self.df[settings.category_cols] = cat
-
-        # (optional) quiet the future warning about silent downcasting
-        self.df.infer_objects(copy=False)
-
-
-        
-
-        self.df[settings.continous_cols] = self.df[settings.continous_cols].fillna(
-            self.df[settings.continous_cols].median()
-        )
-
-        return self.df
-
-    def encode_binary(self):
-
-        encoders = {}
-
-        self.df[settings.target_col[0]] = self.df[settings.target_col[0]].map(
-            settings.target_mapping
+        # One-hot + fillna for the forest, ordinal codes + NaN for native backends
+        backend = get_backend()
+        self.pipeline = FeaturePipeline(
+            encoding=backend.encoding, max_categories=backend.max_categories
         )
 
-        for col in settings.binary_cols:
-            le = LabelEncoder()
-            self.df[col] = le.fit_transform(self.df[col])
-            encoders[col] = le
-
-        with open(f"{ENCODERS_DIR}/binary_encoders.pkl", "wb") as f:
-            pickle.dump(encoders, f)
-
-        return self.df
-
-    def one_hot_encoder(self):
+    @classmethod
+    def from_dataset(cls):
+        """Training data from the cached Parquet copy, only the columns the model uses."""
+        return cls(load_dataset(columns=model_columns()))
 
-        os.makedirs("../artifacts/encoders", exist_ok=True)
+    def fit_transform(self, sparse: bool = None):
+        # Fit fill values / encoders / layout once and write all features into one
+        # float32 matrix (CSR with an unexpanded one-hot block when sparse)
+        if sparse is None:
+            sparse = settings.sparse_onehot
+        # Saved by Train.publish, with the model fitted on it
+        X = self.pipeline.fit_transform(self.df, sparse=sparse)
 
-        ohe = OneHotEncoder(handle_unknown="ignore", sparse_output=False)
+        y = self.df[settings.target_col[0]].map(settings.target_mapping)
+        return X, y.to_numpy()
 
-        X_cat = self.df[settings.category_cols]
-        enc = ohe.fit_transform(X_cat)
+    def preprocess(self):
 
-        enc_cols = ohe.get_feature_names_out(settings.category_cols)
-        enc_df = pd.DataFrame(enc, columns=enc_cols, index=self.df.index).astype(int)
+        X, y = self.fit_transform(sparse=False)
 
-        self.df = pd.concat(
-            [self.df.drop(columns=settings.category_cols), enc_df], axis=1
+        # Wrap (not copy) the matrix so Train keeps getting a named-column frame
+        self.df = pd.DataFrame(
+            X, columns=self.pipeline.feature_names_, index=self.df.index, copy=False
         )
-
-        with open(f"{ENCODERS_DIR}/ohe_encoder.pkl", "wb") as f:
-            pickle.dump(ohe, f)
-
-        return self.df
-
-    def process_datetime(self):
-
-        for col in settings.datetime_cols:
-
-            self.df[col] = pd.to_datetime(self.df[col], format="mixed")
-
-            self.df[f"{col}_year"] = self.df[col].dt.year
-            self.df[f"{col}_month"] = self.df[col].dt.month
-            self.df[f"{col}_day"] = self.df[col].dt.day
-            self.df = self.df.drop(columns=[col])
-
-        return self.df
-
-    def preprocess(self):
-
-        self.df = self.drop_columns()
-        self.df = self.fillna()
-        self.df = self.encode_binary()
-        self.df = self.one_hot_encoder()
-        self.df = self.process_datetime()
+        self.df[settings.target_col[0]] = y
 
         return self.df
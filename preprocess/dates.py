@@ -0,0 +1,214 @@
+"""Vectorized parsing of the `DateLike` columns (purchase / policy dates).
+
+Values are epoch milliseconds, `a/b/yyyy`-style strings, or (straight
+from the Excel sheet) datetime objects. Each kind is split out and converted
+with NumPy arithmetic instead of `pd.to_datetime(format="mixed")`, which
+falls back to per-element dateutil inference.
+
+Semantics match the previous `format="mixed"` parsing for strings and
+datetimes: `a/b/yyyy` is read month-first unless `a` cannot be a month, and
+any string that isn't in that shape is still handed to pandas. Numbers are
+read as epoch milliseconds, as `models.DateLike` documents.
+"""
+
+import datetime
+import re
+
+import numpy as np
+import pandas as pd
+
+_SLASH_DATE = re.compile(r"^(\d{1,2})/(\d{1,2})/(\d{4})$")
+_MS_PER_DAY = 86_400_000
+# Byte values after subtracting ord("0") with uint8 wraparound
+_SLASH = np.uint8((ord("/") - ord("0")) % 256)
+_NUL = np.uint8(-ord("0") % 256)
+_DAYS_IN_MONTH = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+
+def civil_from_days(days: np.ndarray):
+    """Proleptic Gregorian (year, month, day) from days since 1970-01-01."""
+    z = days.astype(np.int64) + 719_468
+    era = np.floor_divide(z, 146_097)
+    doe = z - era * 146_097
+    yoe = (doe - doe // 1460 + doe // 36_524 - doe // 146_096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    day = doy - (153 * mp + 2) // 5 + 1
+    month = np.where(mp < 10, mp + 3, mp - 9)
+    year = yoe + era * 400 + (month <= 2)
+    return year, month, day
+
+
+def _is_valid(year, month, day):
+    leap = ((year % 4 == 0) & (year % 100 != 0)) | (year % 400 == 0)
+    month_ok = (month >= 1) & (month <= 12)
+    limit = _DAYS_IN_MONTH[np.where(month_ok, month, 0)] + (leap & (month == 2))
+    return month_ok & (day >= 1) & (day <= limit)
+
+
+def _slash_dates(strings: np.ndarray):
+    """Parse fixed-width `aa/bb/yyyy` strings with byte arithmetic.
+
+    Returns (parts, ok): an (n, 3) int array and a mask of rows that parsed;
+    rows that didn't (other widths/shapes, impossible dates) are left to pandas.
+    """
+    n = len(strings)
+    parts = np.zeros((n, 3), dtype=np.int64)
+    ok = np.zeros(n, dtype=bool)
+
+    try:
+        # One spare byte: a non-NUL 11th byte means the string is too long
+        raw = np.array(strings, dtype="S11")
+    except UnicodeEncodeError:
+        return parts, ok
+
+    # uint8 arithmetic: anything that isn't '0'..'9' wraps to > 9
+    d = raw.view(np.uint8).reshape(n, 11) - np.uint8(ord("0"))
+    shape_ok = (
+        (d[:, 10] == _NUL)
+        & (d[:, 2] == _SLASH)
+        & (d[:, 5] == _SLASH)
+        & (d[:, [0, 1, 3, 4, 6, 7, 8, 9]] <= 9).all(axis=1)
+    )
+
+    d = d.astype(np.int64)
+    first = d[:, 0] * 10 + d[:, 1]
+    second = d[:, 3] * 10 + d[:, 4]
+    year = d[:, 6] * 1000 + d[:, 7] * 100 + d[:, 8] * 10 + d[:, 9]
+
+    # Month-first unless the first field can't be a month (format="mixed" behaviour)
+    month_first = first <= 12
+    month = np.where(month_first, first, second)
+    day = np.where(month_first, second, first)
+
+    ok = shape_ok & _is_valid(year, month, day)
+    parts[:, 0] = year
+    parts[:, 1] = month
+    parts[:, 2] = day
+    return parts, ok
+
+
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+_KIND = {
+    type(None): 0,
+    type(pd.NaT): 0,
+    str: 1,
+    int: 2,
+    float: 2,
+    np.int64: 2,
+    np.int32: 2,
+    np.float64: 2,
+    np.float32: 2,
+    datetime.datetime: 4,
+    datetime.date: 4,
+    pd.Timestamp: 4,
+}
+
+
+def _classify(obj: np.ndarray) -> np.ndarray:
+    """0 = missing, 1 = string, 2 = number (epoch ms), 3 = other, 4 = datetime object."""
+    kinds = np.fromiter(
+        (_KIND.get(type(v), 3) for v in obj), dtype=np.int8, count=len(obj)
+    )
+    numbers = np.flatnonzero(kinds == 2)
+    if len(numbers):
+        kinds[numbers[np.isnan(obj[numbers].astype(np.float64))]] = 0
+    return kinds
+
+
+def parse_dates(values) -> np.ndarray:
+    """(n, 3) float array of year, month, day; NaN where the value is missing."""
+    series = pd.Series(values, copy=False)
+    n = len(series)
+    out = np.full((n, 3), np.nan)
+
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        dt = series.dt
+        for k, part in enumerate((dt.year, dt.month, dt.day)):
+            out[:, k] = part.to_numpy(dtype=np.float64, na_value=np.nan)
+        return out
+
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(
+        series.dtype
+    ):
+        ms = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        present = ~np.isnan(ms)
+        days = np.floor_divide(ms[present], _MS_PER_DAY)
+        out[present] = np.column_stack(civil_from_days(days))
+        return out
+
+    obj = series.to_numpy(dtype=object)
+    inferred = pd.api.types.infer_dtype(obj, skipna=True)
+    if inferred in ("string", "empty"):
+        # Common case (JSON/CSV input): strings and nulls only, no per-element typing
+        kinds = np.where(pd.isna(obj), 0, 1).astype(np.int8)
+    else:
+        kinds = _classify(obj)
+
+    # epoch milliseconds
+    idx = np.flatnonzero(kinds == 2)
+    if len(idx):
+        days = np.floor_divide(obj[idx].astype(np.float64), _MS_PER_DAY)
+        out[idx] = np.column_stack(civil_from_days(days))
+
+    # datetime / date / Timestamp objects (Excel cells): ordinal day numbers
+    idx = np.flatnonzero(kinds == 4)
+    if len(idx):
+        days = np.fromiter(
+            (v.toordinal() for v in obj[idx]), dtype=np.int64, count=len(idx)
+        )
+        out[idx] = np.column_stack(civil_from_days(days - _EPOCH_ORDINAL))
+
+    # strings: fixed-width slash dates in bulk, anything else through pandas
+    idx = np.flatnonzero(kinds == 1)
+    leftovers = [np.flatnonzero(kinds == 3)]
+    if len(idx):
+        parts, ok = _slash_dates(obj[idx])
+        out[idx[ok]] = parts[ok]
+        leftovers.append(idx[~ok])
+
+    # odd strings and unknown objects: let pandas do it (raises on garbage, as before)
+    idx = np.concatenate(leftovers)
+    if len(idx):
+        parsed = pd.to_datetime(pd.Series(obj[idx]), format="mixed")
+        dt = parsed.dt
+        for k, part in enumerate((dt.year, dt.month, dt.day)):
+            out[idx, k] = part.to_numpy(dtype=np.float64, na_value=np.nan)
+
+    return out
+
+
+def date_parts(value):
+    """Scalar version of `parse_dates` for the single-record fast path."""
+    if value is None or value is pd.NaT:
+        return np.nan, np.nan, np.nan
+
+    if isinstance(value, datetime.date):
+        return value.year, value.month, value.day
+
+    if isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(
+        value, (bool, np.bool_)
+    ):
+        if value != value:
+            return np.nan, np.nan, np.nan
+        d = datetime.date(1970, 1, 1) + datetime.timedelta(
+            days=int(value // _MS_PER_DAY)
+        )
+        return d.year, d.month, d.day
+
+    if isinstance(value, str):
+        m = _SLASH_DATE.match(value)
+        if m:
+            a, b, year = int(m.group(1)), int(m.group(2)), int(m.group(3))
+            month, day = (a, b) if a <= 12 else (b, a)
+            try:
+                datetime.date(year, month, day)
+                return year, month, day
+            except ValueError:
+                pass
+
+    ts = pd.to_datetime(pd.Series([value]), format="mixed").iloc[0]
+    if pd.isna(ts):
+        return np.nan, np.nan, np.nan
+    return ts.year, ts.month, ts.day
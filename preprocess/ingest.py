@@ -0,0 +1,144 @@
+"""Columnar copy of the training spreadsheet.
+
+Parsing `data/claim_use_case_dataset.xlsx` with openpyxl dominates a retrain.
+`ingest` converts it once to Parquet under `[path] data_cache_dir`, named by
+the sha256 of the source file, with explicit dtypes per `config.toml` column
+group; `load_dataset` reads that copy (optionally only some columns) and only
+touches the spreadsheet again when its content changes.
+
+    python -m preprocess.ingest          # build the cache ahead of time (e.g. in Docker)
+"""
+
+import argparse
+import hashlib
+import os
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config.settings import ROOT, get_settings
+from preprocess.dates import parse_dates
+
+settings = get_settings()
+
+
+# Part of the cache file name: bump when the dtypes written below change
+INGEST_VERSION = 1
+
+
+def _resolve(path) -> Path:
+    path = Path(path)
+    return path if path.is_absolute() else ROOT / path
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def model_columns() -> List[str]:
+    """Every column the feature pipeline and the target need."""
+    groups = (
+        settings.binary_cols
+        + settings.category_cols
+        + settings.continous_cols
+        + settings.datetime_cols
+        + settings.target_col
+    )
+    return list(dict.fromkeys(groups))
+
+
+def cache_path(source=None, cache_dir=None) -> Path:
+    source = _resolve(source or settings.data_path)
+    digest = _sha256(source)[:16]
+    cache_dir = Path(cache_dir) if cache_dir is not None else settings.data_cache_dir
+    return cache_dir / f"{source.stem}.{digest}.v{INGEST_VERSION}.parquet"
+
+
+def _read_source(source: Path) -> pd.DataFrame:
+    if source.suffix.lower() == ".csv":
+        return pd.read_csv(source)
+    return pd.read_excel(source)
+
+
+def _dates(values: pd.Series) -> pd.Series:
+    # The sheet mixes Excel datetimes and a/b/yyyy strings, which Parquet
+    # can't hold in one column; store the calendar date the pipeline reads
+    parts = parse_dates(values)
+    present = ~np.isnan(parts).any(axis=1)
+    out = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+    out[present] = pd.to_datetime(
+        pd.DataFrame(parts[present].astype(np.int64), columns=["year", "month", "day"])
+    ).to_numpy()
+    return out
+
+
+def apply_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Explicit dtypes per column group; anything else keeps a columnar type."""
+    df = df.copy()
+    for col in df.columns:
+        values = df[col]
+        if col in settings.continous_cols:
+            df[col] = values.astype("float64")
+        elif col in settings.datetime_cols:
+            df[col] = _dates(values)
+        elif col in settings.binary_cols and pd.api.types.is_numeric_dtype(values):
+            # 1/0 device checks stay numeric so label codes match request values
+            df[col] = values.astype("float64")
+        elif col in settings.binary_cols + settings.category_cols + settings.target_col:
+            df[col] = values.astype("string")
+        elif values.dtype == object:
+            df[col] = values.astype("string")
+    return df
+
+
+def ingest(source=None, force: bool = False, cache_dir=None) -> Path:
+    """Parquet copy of `source` (default `[path] data_path`) in `cache_dir`
+    (default `[path] data_cache_dir`), built if missing."""
+    source = _resolve(source or settings.data_path)
+    path = cache_path(source, cache_dir)
+    if path.exists() and not force:
+        return path
+
+    start = time.perf_counter()
+    df = apply_dtypes(_read_source(source))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+    # Older copies of the same source are never read again
+    for stale in path.parent.glob(f"{source.stem}.*.parquet"):
+        if stale != path:
+            stale.unlink()
+
+    print(
+        f"✅ Ingested {source.name} ({len(df)} rows) to {path} "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    return path
+
+
+def load_dataset(
+    columns: Optional[List[str]] = None, source=None, cache_dir=None
+) -> pd.DataFrame:
+    """The training data from its Parquet copy; `columns` limits what is read."""
+    return pd.read_parquet(ingest(source, cache_dir=cache_dir), columns=columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--source", help="spreadsheet/CSV (default: [path] data_path)")
+    parser.add_argument("--force", action="store_true", help="rebuild even if cached")
+    args = parser.parse_args()
+    print(ingest(args.source, force=args.force))
+
+
+if __name__ == "__main__":
+    main()
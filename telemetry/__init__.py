@@ -0,0 +1,264 @@
+"""Hot-path instrumentation: Prometheus metrics and an opt-in request profiler.
+
+Every stage a request goes through reports its wall time to one
+`claims_stage_seconds{stage=...}` histogram: claim validation, each block of
+`FeaturePipeline.transform` (or the single-claim `transform_record`), the
+model pass, calibration, the micro-batch queue wait and scoring time, and
+the OpenAI calls. Alongside it: per-route request latency, rows per model
+pass, micro-batch sizes, cold start to ready, artifact loads, explanation
+cache hits and misses, and LLM token usage. `GET /metrics` serves all of it
+in the Prometheus text format; each uvicorn worker process reports its own
+numbers.
+
+With `[telemetry] profiling = true`, adding `?profile=true` to any request
+runs it under a sampling profiler and returns folded stacks (one
+`frame;frame;frame count` line per distinct stack, the input of
+flamegraph.pl and speedscope) instead of the normal response.
+"""
+
+import collections
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+
+# 50 µs .. 30 s: a transform block on one claim up to an OpenAI completion
+LATENCY_BUCKETS = (
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+ROW_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384, 65536)
+
+STAGE_SECONDS = Histogram(
+    "claims_stage_seconds",
+    "Wall time spent in each stage of request handling",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_SECONDS = Histogram(
+    "claims_http_request_seconds",
+    "HTTP request latency, first byte received to last byte sent",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+MODEL_BATCH_ROWS = Histogram(
+    "claims_model_batch_rows",
+    "Claims scored per model pass",
+    buckets=ROW_BUCKETS,
+)
+MICROBATCH_SIZE = Histogram(
+    "claims_microbatch_size",
+    "Concurrent /predict claims coalesced into one micro-batch",
+    buckets=ROW_BUCKETS,
+)
+MICROBATCH_ERRORS = Counter(
+    "claims_microbatch_errors_total",
+    "Micro-batched /predict claims that failed to score",
+)
+COLD_START_SECONDS = Gauge(
+    "claims_model_cold_start_seconds",
+    "App import to model ready (loaded or trained) in this worker",
+)
+ARTIFACT_LOADS = Counter(
+    "claims_artifact_loads_total",
+    "Artifacts read from disk (startup, hot reload, batch workers)",
+    ["artifact"],
+)
+ARTIFACT_LOAD_SECONDS = Histogram(
+    "claims_artifact_load_seconds",
+    "Time to read and deserialize one artifact",
+    ["artifact"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "claims_llm_tokens_total",
+    "Tokens billed by the LLM provider",
+    ["kind"],
+)
+EXPLANATION_CACHE = Counter(
+    "claims_explanation_cache_total",
+    "Explanation cache lookups by result: a hit per tier, coalesced, or miss",
+    ["result"],
+)
+LLM_REQUESTS = Counter(
+    "claims_llm_requests_total",
+    "Chat completions sent to the LLM provider",
+    ["mode", "outcome"],
+)
+
+# Bound label children, so a hot-path observation is one dict lookup + observe
+_stages: Dict[str, Histogram] = {}
+
+
+def observe_stage(name: str, seconds: float) -> None:
+    child = _stages.get(name)
+    if child is None:
+        child = _stages.setdefault(name, STAGE_SECONDS.labels(name))
+    child.observe(seconds)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(name, time.perf_counter() - start)
+
+
+@contextmanager
+def artifact_load(name: str) -> Iterator[None]:
+    start = time.perf_counter()
+    yield
+    ARTIFACT_LOAD_SECONDS.labels(name).observe(time.perf_counter() - start)
+    ARTIFACT_LOADS.labels(name).inc()
+
+
+def record_usage(usage) -> None:
+    """Count an OpenAI `usage` block (absent from some streams and mocks)."""
+    if usage is None:
+        return
+    LLM_TOKENS.labels("prompt").inc(usage.prompt_tokens or 0)
+    LLM_TOKENS.labels("completion").inc(usage.completion_tokens or 0)
+
+
+def metrics_payload():
+    """(body, content type) for `GET /metrics`."""
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+# ---------------------------------------------------------------- profiler
+
+# Innermost frames of a thread that is parked, not working: idle thread-pool
+# workers and the event loop waiting in select() would otherwise fill the graph
+_IDLE_FILES = ("threading.py", "selectors.py", "queue.py")
+
+
+class StackSampler:
+    """Samples every thread's Python stack each `interval` seconds.
+
+    Uses `sys._current_frames`, so it needs nothing installed and also sees
+    the thread-pool workers where scoring actually runs. It records the
+    whole process while it runs, not just one request.
+    """
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.samples = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own or frame.f_code.co_filename.endswith(_IDLE_FILES):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(
+                        f"{code.co_name} ({os.path.basename(code.co_filename)}"
+                        f":{code.co_firstlineno})"
+                    )
+                    frame = frame.f_back
+                self.samples[";".join(reversed(stack))] += 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in self.samples.most_common())
+
+
+class TelemetryMiddleware:
+    """ASGI middleware: per-route latency histogram, plus `?profile=true`.
+
+    Plain ASGI rather than `@app.middleware("http")`, so it adds one timer
+    per request and leaves streaming bodies (uploads and SSE) untouched.
+    """
+
+    def __init__(self, app, profiling: bool = False):
+        self.app = app
+        self.profiling = profiling
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        if self.profiling and b"profile=true" in scope.get("query_string", b""):
+            return await self._profile(scope, receive, send)
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_timed(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            # Route template, not the raw path, to keep the label set bounded
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_SECONDS.labels(scope["method"], route, str(status)).observe(
+                time.perf_counter() - start
+            )
+
+    async def _profile(self, scope, receive, send):
+        status = 500
+
+        async def discard(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        with StackSampler() as sampler:
+            await self.app(scope, receive, discard)
+
+        body = sampler.folded().encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/plain; charset=utf-8"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"x-profiled-status", str(status).encode()),
+                    (b"x-profile-samples", str(sum(sampler.samples.values())).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
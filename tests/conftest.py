@@ -0,0 +1,115 @@
+import pickle
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.isotonic import IsotonicRegression
+
+from benchmarks.synthetic import synthetic_claims
+from config.settings import get_settings
+from inference.backends import get_backend
+from inference.readiness import readiness
+from inference.registry import (
+    CALIBRATOR_FILE,
+    PIPELINE_FILE,
+    ArtifactRegistry,
+    model_file,
+    publish_release,
+    registry,
+)
+from preprocess.ingest import load_dataset
+from preprocess.pipeline import FeaturePipeline
+
+settings = get_settings()
+
+
+@pytest.fixture(scope="session")
+def dataset(tmp_path_factory) -> pd.DataFrame:
+    # The Parquet copy goes to a tmp dir, not the repo's artifacts/data
+    return load_dataset(cache_dir=tmp_path_factory.mktemp("data"))
+
+
+@pytest.fixture(scope="session")
+def records(dataset):
+    """Claims typed the way the API receives them: epoch ms, None for missing."""
+    return synthetic_claims(300, seed=7, source=dataset)
+
+
+@pytest.fixture(scope="session")
+def claims(records) -> pd.DataFrame:
+    return pd.DataFrame(records).reindex(columns=settings.FIELD_ORDER)
+
+
+@pytest.fixture(scope="session", params=["random_forest", "hist_gradient_boosting"])
+def pipeline(request, dataset) -> FeaturePipeline:
+    backend = get_backend(request.param)
+    return FeaturePipeline(
+        encoding=backend.encoding, max_categories=backend.max_categories
+    ).fit(dataset)
+
+
+@pytest.fixture(scope="session")
+def trained(dataset, claims):
+    """A small random forest with its pipeline and calibrator, and `claims` as X."""
+    backend = get_backend("random_forest")
+    pipeline = FeaturePipeline(encoding=backend.encoding).fit(dataset)
+    y = dataset[settings.target_col[0]].map(settings.target_mapping).to_numpy()
+    # A small forest is enough to exercise every traversal path
+    forest = backend.finalize(
+        backend.build(n_estimators=20).fit(pipeline.transform(dataset), y)
+    )
+    oob = forest.oob_decision_function_[:, 1]
+    seen = ~np.isnan(oob)
+    calibrator = IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds="clip")
+    calibrator.fit(oob[seen], y[seen])
+    return SimpleNamespace(
+        backend=backend,
+        pipeline=pipeline,
+        forest=forest,
+        calibrator=calibrator,
+        X=pipeline.transform(claims),
+    )
+
+
+@pytest.fixture
+def write_release(trained):
+    """Writes `trained` into a release directory the way `Train.run` does."""
+
+    def write(directory, pipeline=None):
+        directory.mkdir(parents=True)
+        with open(directory / model_file(trained.backend, "sklearn"), "wb") as f:
+            pickle.dump(trained.forest, f)
+        trained.backend.flatten(trained.forest).save(
+            (directory / model_file(trained.backend, "flat")).parent
+        )
+        with open(directory / CALIBRATOR_FILE, "wb") as f:
+            pickle.dump(trained.calibrator, f)
+        (pipeline or trained.pipeline).save(directory / PIPELINE_FILE)
+        return directory
+
+    return write
+
+
+@pytest.fixture
+def served(write_release, trained, tmp_path, monkeypatch):
+    """The app's registry serving `trained` from a release under tmp_path."""
+    directory = write_release(tmp_path / "releases" / "20260101T000000-aaaaaa")
+    release_path = publish_release(
+        directory, trained.backend, tmp_path / "release.json"
+    )
+    artifacts = ArtifactRegistry(release_path, reload_interval=None).load()
+    monkeypatch.setattr(registry, "_snapshot", artifacts)
+    monkeypatch.setattr(registry, "reload_interval", None)
+    monkeypatch.setattr(readiness, "phase", "ready")
+    return artifacts
+
+
+@pytest.fixture
+def client(served):
+    """TestClient without the lifespan: no startup training, LLM client or batcher."""
+    from fastapi.testclient import TestClient
+
+    import app
+
+    return TestClient(app.app)
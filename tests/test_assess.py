@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+import app
+from config.settings import get_settings
+from inference import Infer
+
+settings = get_settings()
+
+
+def test_empty_batch_returns_no_results(client):
+    response = client.post("/assess/batch", json=[])
+
+    assert response.status_code == 200
+    assert response.json() == {"results": [], "explained": 0}
+
+
+def test_batch_matches_the_model(client, served, records):
+    response = client.post("/assess/batch?explain=false", json=records[:20])
+
+    results = response.json()["results"]
+    labels, probabilities = Infer(
+        pd.DataFrame(records[:20]).reindex(columns=settings.FIELD_ORDER),
+        artifacts=served,
+    ).predict_with_proba()
+    assert [r["prediction"] for r in results] == labels.tolist()
+    assert np.allclose([r["probability"] for r in results], probabilities)
+    assert {r["decision"] for r in results} <= {"COMPLETED", "DECLINED"}
+    assert all("explanation" not in r for r in results)
+
+
+def test_only_review_lane_claims_are_explained(client, records, monkeypatch):
+    sent = []
+
+    async def explain_many(claims, timeout, concurrency):
+        sent.extend(claims)
+        return [{"explanation": {"summary": "ok"}, "cached": False} for _ in claims]
+
+    monkeypatch.setattr(app, "explain_many", explain_many)
+    results = client.post("/assess/batch", json=records[:50]).json()
+
+    review = [r for r in results["results"] if r["lane"] == "review"]
+    assert len(sent) == len(review) == results["explained"]
+    assert all(r["explanation"] == {"summary": "ok"} for r in review)
+    assert all(c["decision"] == r["decision"] for c, r in zip(sent, review))
+
+
+def test_single_assess(client, records):
+    response = client.post("/assess?explain=false", json=records[0])
+
+    assert response.status_code == 200
+    assert set(response.json()) == {"prediction", "decision", "probability", "lane"}
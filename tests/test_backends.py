@@ -0,0 +1,37 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from config.settings import get_settings
+from inference.backends import get_backend
+
+settings = get_settings()
+
+
+@pytest.fixture(scope="module")
+def named_forest(trained, dataset):
+    """A forest fitted on a named-column frame, as `Train(df)` does."""
+    X = pd.DataFrame(
+        trained.pipeline.transform(dataset), columns=trained.pipeline.feature_names_
+    )
+    y = dataset[settings.target_col[0]].map(settings.target_mapping).to_numpy()
+    backend = get_backend("random_forest")
+    return backend.finalize(backend.build(n_estimators=20).fit(X, y))
+
+
+@pytest.mark.parametrize("sparse", [False, True], ids=["dense", "sparse"])
+def test_named_model_scores_the_bare_matrix_quietly(
+    named_forest, trained, claims, sparse
+):
+    X = trained.pipeline.transform(claims, sparse=sparse)
+    expected = named_forest.predict_proba(
+        pd.DataFrame(trained.X, columns=named_forest.feature_names_in_)
+    )
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        proba = get_backend("random_forest").predict_proba(named_forest, X)
+
+    assert np.array_equal(proba, expected)
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from inference import Infer, score_rows
+from inference.batch import run
+from inference.registry import registry
+
+
+@pytest.fixture
+def batch_registry(served, tmp_path, monkeypatch):
+    # Pool workers are forked from this process and load the release `served`
+    # published, not the repo's
+    monkeypatch.setattr(registry, "release_path", tmp_path / "release.json")
+    return served
+
+
+def write_csv(path, records):
+    pd.DataFrame(records).to_csv(path, index=False)
+    return str(path)
+
+
+def read_parts(directory):
+    return pd.concat(
+        [pd.read_parquet(part) for part in sorted(directory.glob("part-*.parquet"))],
+        ignore_index=True,
+    )
+
+
+def test_score_rows_isolates_the_bad_claim(served, records):
+    bad = [dict(r) for r in records[:3]]
+    bad[1]["rrp"] = "not a price"
+
+    results = score_rows(bad, served, proba=True)
+
+    assert set(results[0]) == {"prediction", "probability"}
+    assert results[1] == {"error": "could not convert string to float: 'not a price'"}
+    assert results[2]["prediction"] in (0, 1)
+
+
+def test_bad_row_gets_an_error_and_the_rest_are_scored(
+    batch_registry, records, claims, tmp_path
+):
+    rows = [dict(r) for r in records[:40]]
+    rows[25]["rrp"] = "not a price"
+    source = write_csv(tmp_path / "claims.csv", rows)
+
+    report = run([source], str(tmp_path / "out"), workers=1, shard_size=16)
+    parts = read_parts(tmp_path / "out")
+
+    assert (report["shards"], report["rows"], report["errors"]) == (3, 40, 1)
+    assert parts["row_id"].tolist() == list(range(40))
+    assert parts.loc[25, "error"] == "could not convert string to float: 'not a price'"
+    assert pd.isna(parts.loc[25, "prediction"]) and pd.isna(parts.loc[25, "lane"])
+
+    good = parts.drop(index=25)
+    labels, probabilities = Infer(
+        claims.iloc[:40].drop(index=25), artifacts=batch_registry
+    ).predict_with_proba()
+    assert good["error"].isna().all()
+    assert good["prediction"].tolist() == labels.tolist()
+    assert np.allclose(good["probability"], probabilities)
+
+
+def test_parts_share_one_schema_with_or_without_failures(
+    batch_registry, records, tmp_path
+):
+    rows = [dict(r) for r in records[:20]]
+    rows[3]["rrp"] = "not a price"
+    source = write_csv(tmp_path / "claims.csv", rows)
+
+    run([source], str(tmp_path / "out"), workers=1, shard_size=10)
+    schemas = [
+        pq.read_schema(part) for part in sorted((tmp_path / "out").glob("*.parquet"))
+    ]
+
+    assert len(schemas) == 2
+    assert schemas[0].equals(schemas[1])
+
+
+def test_refuses_a_non_empty_output_directory(batch_registry, records, tmp_path):
+    source = write_csv(tmp_path / "claims.csv", records[:5])
+    out = tmp_path / "out"
+    out.mkdir()
+    (out / "part-00000.parquet").touch()
+
+    with pytest.raises(FileExistsError):
+        run([source], str(out), workers=1, shard_size=10)
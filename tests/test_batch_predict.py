@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from inference import Infer, decision_lanes
+
+
+def columns(records):
+    return {field: [record[field] for record in records] for field in records[0]}
+
+
+@pytest.fixture
+def expected(served, claims):
+    return Infer(claims.iloc[:20], artifacts=served).predict_with_proba()
+
+
+@pytest.mark.parametrize("layout", ["rows", "columns"])
+def test_rows_and_columns_score_the_same(client, records, expected, layout):
+    body = records[:20] if layout == "rows" else columns(records[:20])
+
+    response = client.post("/batch-predict?proba=true", json=body)
+
+    assert response.status_code == 200
+    labels, probabilities = expected
+    result = response.json()
+    assert result["predictions"] == labels.tolist()
+    assert np.allclose(result["probabilities"], probabilities)
+    assert result["lanes"] == decision_lanes(labels, probabilities)
+
+
+def test_omitted_columns_take_the_request_defaults(client):
+    rows = [{"rrp": 999.0}, {"rrp": 1319.0}]
+    by_rows = client.post("/batch-predict", json=rows).json()
+    by_columns = client.post("/batch-predict", json={"rrp": [999.0, 1319.0]}).json()
+
+    assert by_rows == by_columns
+    assert len(by_rows["predictions"]) == 2
+
+
+@pytest.mark.parametrize("body", [[], {}], ids=["rows", "columns"])
+def test_empty_batch_has_empty_results(client, body):
+    response = client.post("/batch-predict?proba=true", json=body)
+
+    assert response.status_code == 200
+    assert response.json() == {"predictions": [], "probabilities": [], "lanes": []}
+
+
+def test_single_claim_object_is_rejected(client, records):
+    response = client.post("/batch-predict", json=records[0])
+
+    assert response.status_code == 422
+    assert "single claim object" in response.json()["detail"][0]["msg"]
+
+
+def test_columns_of_different_lengths_are_rejected(client):
+    response = client.post(
+        "/batch-predict", json={"rrp": [999.0, 1319.0], "country": ["NL"]}
+    )
+
+    assert response.status_code == 422
+    assert "same length" in response.json()["detail"][0]["msg"]
+
+
+@pytest.mark.parametrize("layout", ["rows", "columns"])
+def test_invalid_value_reports_where_it_is(client, records, layout):
+    rows = [dict(r) for r in records[:3]]
+    rows[1]["rrp"] = "not a price"
+    body = rows if layout == "rows" else columns(rows)
+
+    response = client.post("/batch-predict", json=body)
+
+    assert response.status_code == 422
+    loc = response.json()["detail"][0]["loc"]
+    assert loc == (["body", 1, "rrp"] if layout == "rows" else ["body", "rrp", 1])
@@ -0,0 +1,109 @@
+import asyncio
+
+from prometheus_client import REGISTRY
+
+from llm.cache import ExplanationCache
+
+
+def lookups(result):
+    return (
+        REGISTRY.get_sample_value("claims_explanation_cache_total", {"result": result})
+        or 0.0
+    )
+
+
+def test_memory_tier_counts_hits_and_misses():
+    cache = ExplanationCache(max_entries=2, ttl=60)
+    hits, misses = lookups("memory"), lookups("miss")
+
+    async def scenario():
+        assert await cache.get("a") is None
+        await cache.put("a", "first")
+        await cache.put("b", "second")
+        await cache.put("c", "third")  # evicts "a", the least recently used
+        return await cache.get("a"), await cache.get("c")
+
+    assert asyncio.run(scenario()) == (None, "third")
+    assert lookups("memory") == hits + 1
+    assert lookups("miss") == misses + 2
+
+
+def test_sqlite_tier_survives_a_restart(tmp_path):
+    path = tmp_path / "explanations.sqlite"
+    disk = lookups("disk")
+
+    async def write():
+        cache = ExplanationCache(10, 60, sqlite_path=path)
+        await cache.put("key", "kept")
+        cache.close()
+
+    async def read():
+        cache = ExplanationCache(10, 60, sqlite_path=path)
+        try:
+            # The disk hit is promoted, so the second read is a memory hit
+            return await cache.get("key"), list(cache._memory)
+        finally:
+            cache.close()
+
+    asyncio.run(write())
+    assert asyncio.run(read()) == ("kept", ["key"])
+    assert lookups("disk") == disk + 1
+
+
+def test_expired_entries_are_misses_in_both_tiers(tmp_path):
+    cache = ExplanationCache(10, ttl=-1, sqlite_path=tmp_path / "explanations.sqlite")
+
+    async def scenario():
+        await cache.put("key", "stale")
+        return await cache.get("key")
+
+    try:
+        assert asyncio.run(scenario()) is None
+    finally:
+        cache.close()
+
+
+def test_concurrent_misses_share_one_call(tmp_path):
+    cache = ExplanationCache(10, 60, sqlite_path=tmp_path / "explanations.sqlite")
+    calls = []
+    coalesced = lookups("coalesced")
+
+    async def create():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "explained"
+
+    async def scenario():
+        results = await asyncio.gather(
+            *(cache.get_or_create("key", create) for _ in range(5))
+        )
+        return results, await cache.get_or_create("key", create)
+
+    try:
+        results, again = asyncio.run(scenario())
+    finally:
+        cache.close()
+
+    assert calls == [1]
+    assert sorted(results) == [("explained", False)] + [("explained", True)] * 4
+    assert again == ("explained", True)
+    assert lookups("coalesced") == coalesced + 4
+
+
+def test_failures_are_not_cached():
+    cache = ExplanationCache(10, 60)
+
+    async def fail():
+        raise RuntimeError("upstream down")
+
+    async def succeed():
+        return "explained"
+
+    async def scenario():
+        try:
+            await cache.get_or_create("key", fail)
+        except RuntimeError:
+            pass
+        return await cache.get_or_create("key", succeed)
+
+    assert asyncio.run(scenario()) == ("explained", False)
@@ -0,0 +1,50 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from llm.prompts import SYSTEM_PROMPT
+from preprocess.dates import parse_dates
+
+
+def mixed(values) -> np.ndarray:
+    parsed = pd.to_datetime(pd.Series(values, dtype=object), format="mixed")
+    return np.column_stack([parsed.dt.year, parsed.dt.month, parsed.dt.day]).astype(
+        float
+    )
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        ["01/02/2021", "13/06/2022", "31/12/2023", "29/02/2024"],
+        ["2021-02-01", "2022-06-13T10:30:00", "2023-12-31 23:59:59"],
+        ["05/03/2021", None, "", "28/02/2023"],
+        ["01/02/2021", datetime.datetime(2022, 6, 13), pd.Timestamp("2023-12-31")],
+    ],
+    ids=["a/b/yyyy", "iso", "missing", "objects"],
+)
+def test_parse_dates_matches_to_datetime_mixed(values):
+    assert np.array_equal(parse_dates(pd.Series(values)), mixed(values), equal_nan=True)
+
+
+def test_parse_dates_reads_integers_as_epoch_ms():
+    # Deliberately not pandas' reading (nanoseconds): the API sends epoch ms
+    ms = pd.Series([1_612_137_600_000, 1_655_078_400_000])
+    assert parse_dates(ms).tolist() == [[2021.0, 2.0, 1.0], [2022.0, 6.0, 13.0]]
+
+
+def test_slash_dates_are_month_first_unless_the_day_is_over_12():
+    parts = parse_dates(pd.Series(["05/03/2021", "13/03/2021", "03/13/2021"]))
+    assert parts.tolist() == [
+        [2021.0, 5.0, 3.0],
+        [2021.0, 3.0, 13.0],
+        [2021.0, 3.0, 13.0],
+    ]
+
+
+def test_prompt_glossary_leaves_out_input_date_formats():
+    # Dates reach the model as YYYY-MM-DD, so the input formats would only mislead it
+    assert "policyStartDate: Policy start date." in SYSTEM_PROMPT
+    assert "dd/mm" not in SYSTEM_PROMPT and "epoch" not in SYSTEM_PROMPT
@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+
+from inference.flat import FlatForest
+
+
+@pytest.mark.parametrize("rows", [1, 7, 300])
+def test_flat_matches_sklearn(trained, rows):
+    flat = FlatForest.from_forest(trained.forest)
+    X = trained.X[:rows]
+
+    assert np.array_equal(flat.predict_proba(X), trained.forest.predict_proba(X))
+    assert np.array_equal(flat.predict(X), trained.forest.predict(X))
+
+
+def test_flat_survives_save_and_load(trained, tmp_path):
+    path = FlatForest.from_forest(trained.forest).save(tmp_path / "flat")
+
+    loaded = FlatForest.load(path, mmap_mode="r")
+    assert np.array_equal(
+        loaded.predict_proba(trained.X), trained.forest.predict_proba(trained.X)
+    )
@@ -0,0 +1,92 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from prometheus_client import REGISTRY
+
+import llm.stream
+from llm import llm_client
+from llm.cache import ExplanationCache
+
+
+class FakeStream:
+    """What `chat.completions.create(stream=True)` returns, for fixed deltas."""
+
+    def __init__(self, deltas):
+        self.chunks = [
+            SimpleNamespace(
+                choices=[SimpleNamespace(delta=SimpleNamespace(content=delta))],
+                usage=None,
+            )
+            for delta in deltas
+        ]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Set the deltas the fake provider streams back."""
+    state = SimpleNamespace(deltas=[], calls=0)
+
+    async def create(**kwargs):
+        state.calls += 1
+        return FakeStream(state.deltas)
+
+    fake = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+
+    async def get_client():
+        return fake
+
+    monkeypatch.setattr(llm_client, "_get_client", get_client)
+    monkeypatch.setattr(llm_client, "_semaphore", asyncio.Semaphore(4))
+    monkeypatch.setattr(llm.stream, "explanation_cache", ExplanationCache(10, 60))
+    return state
+
+
+def ttft_count():
+    return (
+        REGISTRY.get_sample_value("claims_stage_seconds_count", {"stage": "llm.ttft"})
+        or 0.0
+    )
+
+
+def explain(client, record):
+    body = dict(record, decision="COMPLETED")
+    return client.post("/explian?stream=true", json=body)
+
+
+def test_stream_records_ttft_and_caches_the_text(client, records, upstream):
+    upstream.deltas = ["Approved ", "because ", "cover is active."]
+    before = ttft_count()
+
+    first = explain(client, records[0])
+    assert first.headers["X-Cache"] == "MISS"
+    assert "cover is active." in first.text
+    assert ttft_count() == before + 1
+
+    second = explain(client, records[0])
+    assert second.headers["X-Cache"] == "HIT"
+    assert '"delta": "Approved because cover is active."' in second.text
+    assert upstream.calls == 1
+
+
+def test_empty_completion_is_not_cached(client, records, upstream):
+    upstream.deltas = []
+
+    assert explain(client, records[1]).headers["X-Cache"] == "MISS"
+    assert explain(client, records[1]).headers["X-Cache"] == "MISS"
+    assert upstream.calls == 2
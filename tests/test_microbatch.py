@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+
+from inference import Infer
+from inference.microbatch import MicroBatcher, score_records
+
+
+def sample(name):
+    return REGISTRY.get_sample_value(name) or 0.0
+
+
+@pytest.fixture
+def claims_with_a_bad_one(records):
+    claims = [dict(r) for r in records[:5]]
+    claims[2]["rrp"] = "not a price"
+    return claims
+
+
+def test_score_records_fails_only_the_bad_claim(served, claims_with_a_bad_one):
+    results = score_records(claims_with_a_bad_one, served)
+
+    assert isinstance(results[2], ValueError)
+    for i in (0, 1, 3, 4):
+        assert results[i] == Infer.predict_record_proba(
+            claims_with_a_bad_one[i], served
+        )
+
+
+def test_concurrent_submits_share_one_batch(served, claims_with_a_bad_one):
+    batches = sample("claims_microbatch_size_count")
+    errors = sample("claims_microbatch_errors_total")
+
+    async def scenario():
+        batcher = MicroBatcher(max_batch_size=8, max_wait_ms=50)
+        batcher.start()
+        try:
+            return await asyncio.gather(
+                *(batcher.submit(claim) for claim in claims_with_a_bad_one),
+                return_exceptions=True,
+            )
+        finally:
+            await batcher.aclose()
+
+    results = asyncio.run(scenario())
+
+    assert isinstance(results[2], ValueError)
+    for i in (0, 1, 3, 4):
+        assert results[i] == Infer.predict_record_proba(
+            claims_with_a_bad_one[i], served
+        )
+    assert sample("claims_microbatch_size_count") == batches + 1
+    assert sample("claims_microbatch_errors_total") == errors + 1
+
+
+def test_batch_size_one_scores_each_claim_directly(served, records):
+    async def scenario():
+        batcher = MicroBatcher(max_batch_size=1, max_wait_ms=50)
+        batcher.start()
+        assert not batcher.started
+        return await batcher.submit(records[0])
+
+    assert asyncio.run(scenario()) == Infer.predict_record_proba(records[0], served)
@@ -0,0 +1,19 @@
+import numpy as np
+import scipy.sparse as sp
+
+
+def test_transform_record_matches_transform(pipeline, records, claims):
+    batch = pipeline.transform(claims)
+    singles = np.vstack([pipeline.transform_record(record) for record in records])
+
+    assert singles.shape == batch.shape
+    assert np.array_equal(singles, batch, equal_nan=True)
+
+
+def test_sparse_matches_dense(pipeline, claims):
+    dense = pipeline.transform(claims)
+    sparse = pipeline.transform(claims, sparse=True)
+
+    if sp.issparse(sparse):
+        sparse = sparse.toarray()
+    assert np.array_equal(sparse, dense, equal_nan=True)
@@ -0,0 +1,26 @@
+from prometheus_client import REGISTRY
+
+from inference.readiness import ModelReadiness
+
+
+def test_failed_startup_is_retried_until_ready():
+    calls = []
+
+    def prepare(status):
+        calls.append(status.phase)
+        status.set_phase("loading")
+        if len(calls) < 3:
+            raise OSError("release.json vanished")
+
+    readiness = ModelReadiness(retry_seconds=0.01, max_retry_seconds=0.02)
+    readiness.start(prepare)
+    readiness._thread.join(timeout=5)
+
+    assert calls == ["starting", "failed", "failed"]
+    assert readiness.ready
+    assert readiness.error is None
+    assert readiness.cold_start_seconds is not None
+    assert (
+        REGISTRY.get_sample_value("claims_model_cold_start_seconds")
+        == readiness.cold_start_seconds
+    )
@@ -0,0 +1,150 @@
+import json
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from inference.backends import get_backend
+from inference.registry import (
+    PUBLISHED_MARKER,
+    ArtifactRegistry,
+    publish_release,
+    release_lock,
+)
+from preprocess.pipeline import FeaturePipeline
+
+BACKEND = get_backend("random_forest")
+
+
+@pytest.fixture
+def artifacts_dir(tmp_path):
+    return tmp_path / "artifacts"
+
+
+def publish(write_release, artifacts_dir, name, keep=3, **kwargs):
+    directory = write_release(artifacts_dir / "releases" / name, **kwargs)
+    release_path = artifacts_dir / "release.json"
+    publish_release(directory, BACKEND, release_path, keep=keep)
+    return directory
+
+
+def test_publish_records_every_file_with_its_hash(write_release, artifacts_dir):
+    directory = publish(write_release, artifacts_dir, "20260101T000000-aaaaaa")
+
+    release = json.loads((artifacts_dir / "release.json").read_text())
+    assert release["release"] == directory.name
+    assert set(release["files"]) == {"pipeline", "calibrator", "sklearn", "flat"}
+    assert set(release["sha256"]) == set(release["files"])
+    assert (directory / PUBLISHED_MARKER).exists()
+
+
+def test_publish_refuses_an_incomplete_release(write_release, artifacts_dir):
+    directory = write_release(artifacts_dir / "releases" / "20260101T000000-aaaaaa")
+    (directory / "calibrator.pkl").unlink()
+
+    with pytest.raises(FileNotFoundError, match="not a complete release"):
+        publish_release(directory, BACKEND, artifacts_dir / "release.json")
+    assert not (artifacts_dir / "release.json").exists()
+
+
+def test_prune_keeps_unpublished_and_newer_releases(write_release, artifacts_dir):
+    releases = artifacts_dir / "releases"
+    old = [
+        publish(write_release, artifacts_dir, f"2026010{i}T000000-aaaaaa", keep=2)
+        for i in range(1, 4)
+    ]
+    # A run that started earlier and is still writing, and one started later
+    in_progress = write_release(releases / "20260101T120000-bbbbbb")
+    newer = write_release(releases / "20260109T000000-cccccc")
+
+    current = publish(write_release, artifacts_dir, "20260105T000000-dddddd", keep=2)
+
+    remaining = sorted(p.name for p in releases.iterdir())
+    assert remaining == sorted(
+        [in_progress.name, old[-1].name, current.name, newer.name]
+    )
+
+
+def test_release_lock_excludes_other_processes(artifacts_dir):
+    release_path = artifacts_dir / "release.json"
+    probe = (
+        "import fcntl, sys\n"
+        "f = open(sys.argv[1], 'a')\n"
+        "try:\n"
+        "    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)\n"
+        "except BlockingIOError:\n"
+        "    sys.exit(3)\n"
+    )
+    lock_path = str(artifacts_dir / "release.lock")
+    with release_lock(release_path):
+        held = subprocess.run([sys.executable, "-c", probe, lock_path])
+    free = subprocess.run([sys.executable, "-c", probe, lock_path])
+
+    assert (held.returncode, free.returncode) == (3, 0)
+
+
+def test_release_lock_is_reentrant(artifacts_dir):
+    release_path = artifacts_dir / "release.json"
+    with release_lock(release_path):
+        with release_lock(release_path):
+            pass
+    assert (artifacts_dir / "release.lock").exists()
+
+
+def reloaded(registry):
+    """`get()` after the background reload it triggers has finished."""
+    registry.get()
+    if registry._reload_thread is not None:
+        registry._reload_thread.join(timeout=30)
+    return registry.get()
+
+
+def test_reload_swaps_in_a_new_release(write_release, artifacts_dir, trained):
+    first = publish(write_release, artifacts_dir, "20260101T000000-aaaaaa")
+    registry = ArtifactRegistry(
+        artifacts_dir / "release.json", engine="flat", reload_interval=0.0
+    )
+    assert registry.get().release == first.name
+
+    second = publish(write_release, artifacts_dir, "20260102T000000-bbbbbb")
+    snapshot = reloaded(registry)
+
+    assert snapshot.release == second.name
+    assert registry.load_count == 2
+    proba = snapshot.backend.predict_proba(snapshot.model, trained.X)
+    assert np.array_equal(proba, trained.forest.predict_proba(trained.X))
+
+
+def test_get_does_not_wait_for_a_reload(write_release, artifacts_dir):
+    first = publish(write_release, artifacts_dir, "20260101T000000-aaaaaa")
+    registry = ArtifactRegistry(
+        artifacts_dir / "release.json", engine="flat", reload_interval=0.0
+    )
+    registry.get()
+    publish(write_release, artifacts_dir, "20260102T000000-bbbbbb")
+
+    # While the reload holds the registry lock, get() still answers at once
+    with registry._lock:
+        assert registry.get().release == first.name
+        assert registry.get().release == first.name
+    registry._reload_thread.join(timeout=30)
+    assert registry.load_count == 2
+
+
+def test_bad_release_keeps_the_old_one_serving(write_release, artifacts_dir, dataset):
+    good = publish(write_release, artifacts_dir, "20260101T000000-aaaaaa")
+    registry = ArtifactRegistry(
+        artifacts_dir / "release.json", engine="flat", reload_interval=0.0
+    )
+    registry.get()
+
+    # A pipeline writing another number of features than the model expects
+    narrow = FeaturePipeline(encoding="onehot").fit(dataset.head(20))
+    publish(write_release, artifacts_dir, "20260102T000000-bbbbbb", pipeline=narrow)
+
+    assert reloaded(registry).release == good.name
+    assert reloaded(registry).release == good.name
+    # The broken release is tried once, not on every request
+    assert registry.load_count == 1
+    assert registry._failed_stat is not None
@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+import pandas as pd
+import pytest
+
+from inference import Infer
+from inference.stream import iter_csv, iter_ndjson, score_stream
+
+
+def lines(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+async def pieces(data: bytes, size: int):
+    # Chunk boundaries fall mid-line and mid-character, as an upload's may
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+def ndjson(records) -> bytes:
+    return "".join(json.dumps(r) + "\n" for r in records).encode()
+
+
+@pytest.fixture
+def predictions(served, claims):
+    return Infer(claims.iloc[:10], artifacts=served).predict()
+
+
+def test_ndjson_rows_are_scored_in_order(client, records, predictions):
+    response = client.post("/batch-predict/stream", content=ndjson(records[:10]))
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert lines(response) == [
+        {"row": i, "prediction": p} for i, p in enumerate(predictions)
+    ]
+
+
+def test_csv_matches_ndjson(client, records, predictions):
+    rows = [dict(r) for r in records[:10]]
+    # A quoted field spanning lines stays one value
+    rows[4]["issueDesc"] = 'Screen cracked,\n"badly" after a drop'
+    body = pd.DataFrame(rows).to_csv(index=False).encode()
+
+    response = client.post(
+        "/batch-predict/stream", content=body, headers={"Content-Type": "text/csv"}
+    )
+
+    assert lines(response) == [
+        {"row": i, "prediction": p} for i, p in enumerate(predictions)
+    ]
+
+
+def test_bad_rows_get_errors_and_the_rest_are_scored(client, records, predictions):
+    rows = [dict(r) for r in records[:10]]
+    rows[6]["rrp"] = "not a price"  # fails validation
+    # Valid for the request model, rejected by the fitted pipeline
+    rows[8]["policyStartDate"] = "not a date"
+    body = ndjson(rows).replace(json.dumps(rows[2]).encode(), b"{not json")
+
+    results = lines(client.post("/batch-predict/stream", content=body))
+
+    assert [r["row"] for r in results] == list(range(10))
+    assert set(results[2]) == set(results[6]) == set(results[8]) == {"row", "error"}
+    assert results[6]["error"].startswith("rrp: ")
+    assert "not a date" in results[8]["error"]
+    for i in (0, 1, 3, 4, 5, 7, 9):
+        assert results[i] == {"row": i, "prediction": predictions[i]}
+
+
+def test_unsupported_format_is_rejected(client):
+    response = client.post("/batch-predict/stream?format=xml", content=b"<claims/>")
+
+    assert response.status_code == 415
+
+
+@pytest.mark.parametrize("size", [1, 7, 4096])
+def test_stream_output_does_not_depend_on_chunking(served, records, size):
+    rows = [dict(r) for r in records[:25]]
+    rows[3]["issueDesc"] = "Écran cassé"  # multi-byte characters split across chunks
+
+    async def score(parse, data):
+        out = b""
+        async for part in score_stream(parse(pieces(data, size)), served, 4):
+            out += part
+        return [json.loads(line) for line in out.decode().splitlines()]
+
+    from_ndjson = asyncio.run(score(iter_ndjson, ndjson(rows)))
+    from_csv = asyncio.run(
+        score(iter_csv, pd.DataFrame(rows).to_csv(index=False).encode())
+    )
+
+    assert [r["row"] for r in from_ndjson] == list(range(25))
+    assert all("prediction" in r for r in from_ndjson)
+    assert from_csv == from_ndjson
@@ -1,23 +1,83 @@
 import os
-import sys
+import time
+from pathlib import Path
 
 import pickle
 import pandas as pd
 
+import numpy as np
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
+from sklearn.isotonic import IsotonicRegression
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import (
+    HalvingRandomSearchCV,
+    RandomizedSearchCV,
+    cross_val_predict,
+    train_test_split,
+)
 
 from sklearn import metrics
 
-sys.path.append(os.path.abspath(".."))
-from config.settings import Settings
+from config.settings import get_settings
+from inference.backends import get_backend
+from inference.registry import (
+    CALIBRATOR_FILE,
+    PIPELINE_FILE,
+    model_file,
+    new_release_dir,
+    publish_release,
+)
 
-settings = Settings()
+settings = get_settings()
+
+METRICS_DIR = settings.metrics_dir
+
+
+def _save(obj, path: Path):
+    # Write then rename so a serving registry never unpickles a half-written file
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        pickle.dump(obj, f)
+    os.replace(tmp_path, path)
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
 
 
 class Train:
-    def __init__(self, df: pd.DataFrame):
+    """Fit, calibrate and score one model, and publish it as a release.
+
+    Everything is written into a fresh `releases/<id>/` directory; the
+    registry only sees it once `run` has saved the pipeline too and replaced
+    release.json, so a serving worker never pairs a new pipeline with an
+    old model. Without a `pipeline` the release is written but not published.
+    """
+
+    def __init__(self, df: pd.DataFrame, categorical_features=None, pipeline=None):
         self.df = df
+        self.X = None
+        self.y = None
+        # Model family from [model] backend; categorical_features is the
+        # pipeline's categorical_mask_ for backends that split on categories
+        self.backend = get_backend()
+        self.categorical_features = categorical_features
+        self.pipeline = pipeline
+        self.release_dir = None
+        self.best_params = None
+        self.search_seconds = None
+        self.cv_score = None
+
+    @classmethod
+    def from_arrays(cls, X, y, categorical_features=None, pipeline=None):
+        """Train straight on a feature matrix (dense or scipy CSR) and label vector."""
+        trainer = cls(None, categorical_features, pipeline)
+        trainer.X, trainer.y = X, y
+        return trainer
 
     def X_y(self):
         target = settings.target_col[0]
@@ -35,18 +95,166 @@ class Train:
         )
         return self.X_train, self.X_test, self.y_train, self.y_test
 
+    def search_space(self):
+        space = {}
+        for name, values in settings.train_search["space"].items():
+            # TOML has no null: 0 stands for "unlimited"
+            if name in ("max_depth", "max_leaf_nodes"):
+                values = [v or None for v in values]
+            # toml arrays can't mix types: "0.3" in max_features is a fraction
+            if name == "max_features":
+                values = [_number(v) for v in values]
+            space[name] = list(values)
+        return space
+
+    def select(self, cv_results):
+        """Index of the cheapest candidate that is good enough.
+
+        Good enough = CV score >= `target`, or within `tolerance` of the best
+        when no target is set. Cheapest = fewest trees x depth, which tracks
+        both model size and per-row latency.
+        """
+        config = settings.train_search
+        scores = np.asarray(cv_results["mean_test_score"], dtype=float)
+        scores = np.where(np.isnan(scores), -np.inf, scores)
+        best = scores.max()
+        bar = config["target"] or best - config["tolerance"]
+        eligible = np.flatnonzero(scores >= bar)
+        if not len(eligible):
+            eligible = [int(scores.argmax())]
+
+        def cost(i):
+            params = cv_results["params"][i]
+            trees = params.get("n_estimators", 100)
+            depth = params.get("max_depth") or 32
+            return trees * depth, -scores[i]
+
+        return min(eligible, key=cost)
+
+    def search(self):
+        config = settings.train_search
+        # Parallelise across candidates/folds; each forest is fitted single-threaded
+        estimator = RandomForestClassifier(random_state=settings.random_state)
+        common = dict(
+            cv=config["cv"],
+            scoring=config["scoring"],
+            refit=False,
+            random_state=settings.random_state,
+            n_jobs=settings.train_n_jobs,
+        )
+        if config["method"] == "halving":
+            searcher = HalvingRandomSearchCV(
+                estimator,
+                self.search_space(),
+                n_candidates=config["n_candidates"],
+                min_resources="exhaust",
+                **common,
+            )
+        else:
+            searcher = RandomizedSearchCV(
+                estimator, self.search_space(), n_iter=config["n_candidates"], **common
+            )
+
+        start = time.perf_counter()
+        searcher.fit(self.X_train, self.y_train)
+        self.search_seconds = time.perf_counter() - start
+
+        if config["method"] == "halving":
+            # Only candidates that survived to the last round saw all the data
+            last = (
+                np.asarray(searcher.cv_results_["iter"]) == searcher.n_iterations_ - 1
+            )
+            cv_results = {
+                key: [v for v, keep in zip(values, last) if keep]
+                for key, values in searcher.cv_results_.items()
+                if key in ("params", "mean_test_score")
+            }
+        else:
+            cv_results = searcher.cv_results_
+
+        chosen = self.select(cv_results)
+        self.best_params = cv_results["params"][chosen]
+        self.cv_score = float(cv_results["mean_test_score"][chosen])
+        print(
+            f"📌 Search picked {self.best_params} "
+            f"(CV {config['scoring']} {self.cv_score:.4f}, best "
+            f"{np.nanmax(cv_results['mean_test_score']):.4f}) in {self.search_seconds:.1f}s"
+        )
+        return self.best_params
+
     def train_model(self):
-        self.model = RandomForestClassifier(random_state=settings.random_state)
+        params = self.best_params if self.best_params is not None else {}
+        self.model = self.backend.build(self.categorical_features, **params)
+        start = time.perf_counter()
         self.model.fit(self.X_train, self.y_train)
+        self.fit_seconds = time.perf_counter() - start
+
+        self.model = self.backend.finalize(self.model)
 
-        model_path = "../artifacts/models/random_forest.pkl"
-        os.makedirs(os.path.dirname(model_path), exist_ok=True)
-        with open(model_path, "wb") as f:
-            pickle.dump(self.model, f)
+        model_path = self.release_dir / model_file(self.backend, "sklearn")
+        _save(self.model, model_path)
+        self.model_bytes = model_path.stat().st_size
 
         print(f"✅ Model saved at {model_path}")
+
+        # Array export for the "flat" engine: same scores, no sklearn per-call overhead
+        self.flat_model = None
+        if self.backend.can_flatten:
+            self.flat_model = self.backend.flatten(self.model)
+            flat_path = self.flat_model.save(
+                (self.release_dir / model_file(self.backend, "flat")).parent
+            )
+            print(f"✅ Flat model saved at {flat_path}")
         return self.model
 
+    def _positive(self, proba):
+        return proba[:, list(self.model.classes_).index(1)]
+
+    def out_of_fold_proba(self):
+        """P(class 1) for each training row from trees/folds that never saw it."""
+        # Bagged forests get this for free; boosting has no OOB and is refitted per fold
+        oob = getattr(self.model, "oob_decision_function_", None)
+        if oob is not None:
+            return self._positive(oob)
+        return self._positive(
+            cross_val_predict(
+                self.model, self.X_train, self.y_train, cv=5, method="predict_proba"
+            )
+        )
+
+    def calibrate(self):
+        # Isotonic map from raw model scores to observed approval rates, fitted on
+        # out-of-fold scores (in-sample forest scores are near 0/1 and useless here)
+        proba = self.out_of_fold_proba()
+        seen = ~np.isnan(proba)
+        self.calibrator = IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds="clip")
+        self.calibrator.fit(proba[seen], np.asarray(self.y_train)[seen])
+
+        calibrator_path = self.release_dir / CALIBRATOR_FILE
+        _save(self.calibrator, calibrator_path)
+
+        print(f"✅ Calibrator saved at {calibrator_path}")
+        return self.calibrator
+
+    def serving_cost(self, model=None, rows: int = 200) -> dict:
+        """Per-row predict latency: one row per call (API) and the whole test set."""
+        model = model if model is not None else self.model
+        n = min(rows, self.X_test.shape[0])
+        timings = []
+        for i in range(n):
+            start = time.perf_counter()
+            self.backend.predict_proba(model, self.X_test[i : i + 1])
+            timings.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        self.backend.predict_proba(model, self.X_test)
+        batch = time.perf_counter() - start
+
+        return {
+            "single_row_ms": float(np.median(timings)) * 1e3,
+            "batch_row_us": batch / self.X_test.shape[0] * 1e6,
+        }
+
     def score(self):
         y_train_pred = self.model.predict(self.X_train)
         y_test_pred = self.model.predict(self.X_test)
@@ -54,6 +262,15 @@ class Train:
         y_train_proba = self.model.predict_proba(self.X_train)[:, 1]
         y_test_proba = self.model.predict_proba(self.X_test)[:, 1]
 
+        y_test_calibrated = self.calibrator.predict(y_test_proba)
+        y_test = np.asarray(self.y_test)
+        approve = (y_test_pred == 1) & (
+            y_test_calibrated >= settings.auto_approve_threshold
+        )
+        decline = (y_test_pred == 0) & (
+            y_test_calibrated <= settings.auto_decline_threshold
+        )
+
         results = {
             "train": {
                 "accuracy": metrics.accuracy_score(self.y_train, y_train_pred),
@@ -64,38 +281,127 @@ class Train:
                 "accuracy": metrics.accuracy_score(self.y_test, y_test_pred),
                 "f1": metrics.f1_score(self.y_test, y_test_pred),
                 "roc_auc": metrics.roc_auc_score(self.y_test, y_test_proba),
+                "brier": metrics.brier_score_loss(self.y_test, y_test_proba),
+                "brier_calibrated": metrics.brier_score_loss(
+                    self.y_test, y_test_calibrated
+                ),
+                # Share of claims fast-laned by [decision] and how often that was right
+                "auto_approve_rate": approve.mean(),
+                "auto_approve_precision": (
+                    y_test[approve].mean() if approve.any() else float("nan")
+                ),
+                "auto_decline_rate": decline.mean(),
+                "auto_decline_precision": (
+                    (1 - y_test[decline]).mean() if decline.any() else float("nan")
+                ),
             },
         }
 
+        results["model"] = {
+            "backend": self.backend.name,
+            "params": {**self.backend.params(), **(self.best_params or {})},
+            "cv_score": self.cv_score,
+            "search_seconds": self.search_seconds,
+            "fit_seconds": self.fit_seconds,
+            "model_mb": self.model_bytes / 2**20,
+            "n_nodes": self.backend.n_nodes(self.model),
+            **self.serving_cost(),
+        }
+        if self.flat_model is not None:
+            results["model"]["flat"] = self.serving_cost(self.flat_model)
+
         report = []
         for split in ["train", "test"]:
             report.append(f"=== {split.upper()} RESULTS ===")
             report.append(f"Accuracy : {results[split]['accuracy']:.4f}")
             report.append(f"F1-score : {results[split]['f1']:.4f}")
             report.append(f"ROC AUC  : {results[split]['roc_auc']:.4f}")
+            if "brier" in results[split]:
+                report.append(
+                    f"Brier    : {results[split]['brier']:.4f} raw, "
+                    f"{results[split]['brier_calibrated']:.4f} calibrated"
+                )
+                report.append(
+                    f"Fast lane: {results[split]['auto_approve_rate']:.1%} auto-approve "
+                    f"(precision {results[split]['auto_approve_precision']:.3f}), "
+                    f"{results[split]['auto_decline_rate']:.1%} auto-decline "
+                    f"(precision {results[split]['auto_decline_precision']:.3f})"
+                )
             report.append("")
 
-        os.makedirs("../artifacts/metrics", exist_ok=True)
-        out_path = "../artifacts/metrics/model_scores.txt"
+        model = results["model"]
+        report.append("=== MODEL ===")
+        report.append(f"Backend  : {model['backend']}")
+        report.append(f"Params   : {model['params'] or 'defaults'}")
+        if model["search_seconds"] is not None:
+            report.append(
+                f"Search   : {model['search_seconds']:.1f}s, "
+                f"CV {settings.train_search['scoring']} {model['cv_score']:.4f}"
+            )
+        report.append(
+            f"Fit time : {model['fit_seconds']:.2f}s (n_jobs={settings.train_n_jobs})"
+        )
+        report.append(
+            f"Size     : {model['model_mb']:.2f} MB, {model['n_nodes']:,} nodes"
+        )
+        report.append(
+            f"Latency  : {model['single_row_ms']:.2f} ms single row, "
+            f"{model['batch_row_us']:.1f} us/row batched"
+        )
+        if "flat" in model:
+            report.append(
+                f"Flat     : {model['flat']['single_row_ms']:.2f} ms single row, "
+                f"{model['flat']['batch_row_us']:.1f} us/row batched"
+            )
+        report.append("")
+
+        METRICS_DIR.mkdir(parents=True, exist_ok=True)
+        out_path = METRICS_DIR / "model_scores.txt"
         with open(out_path, "w") as f:
             f.write("\n".join(report))
 
         print(f"✅ Scores saved to {out_path}")
         return results
 
+    def publish(self):
+        if self.pipeline is None:
+            print(f"📌 No feature pipeline: {self.release_dir} not published")
+            return None
+        self.pipeline.save(self.release_dir / PIPELINE_FILE)
+        path = publish_release(self.release_dir, self.backend)
+        print(f"✅ Release {self.release_dir.name} published in {path}")
+        return path
+
     def run(self):
         # Full training pipeline
         print("📌 Splitting features and target...")
-        X, y = self.X_y()
+        if self.df is not None:
+            X, y = self.X_y()
+        else:
+            X, y = self.X, self.y
+
+        self.release_dir = new_release_dir()
 
         print("📌 Splitting into train/test...")
         self.split_data(X, y)
 
+        if settings.train_search["enabled"]:
+            if self.backend.name == "random_forest":
+                print("📌 Searching hyperparameters...")
+                self.search()
+            else:
+                # [train.search.space] describes forests
+                print(f"📌 Skipping hyperparameter search for {self.backend.name}")
+
         print("📌 Training model...")
         self.train_model()
 
+        print("📌 Calibrating probabilities...")
+        self.calibrate()
+
         print("📌 Evaluating model...")
         results = self.score()
 
+        self.publish()
         print("✅ Pipeline finished.")
         return results